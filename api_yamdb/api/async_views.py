@@ -0,0 +1,96 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+from rest_framework import routers
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def render_in_thread(view, request, *args, **kwargs):
+    """
+    Вызов и рендеринг синхронного вью в потоке из пула.
+
+    Соединения с БД потоков пула не закрываются обработчиком запроса,
+    поэтому закрываются здесь так же, как по request_started/finished.
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Асинхронная обёртка вью DRF для чтения под ASGI.
+
+    Django 3.2 выполняет синхронные вью под ASGI через
+    sync_to_async(thread_sensitive=True), то есть по одному в общем
+    потоке процесса. Обёртка выполняет чтение в пуле потоков
+    параллельно, а цикл событий тем временем обслуживает медленных
+    клиентов. В ORM Django 3.2 нет асинхронных методов, поэтому запросы
+    к БД тоже выполняются в потоке.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(
+            render_in_thread, thread_sensitive=False
+        )(view, request, *args, **kwargs)
+
+    return wrapper
+
+
+class AsyncReadHandlerMixin:
+    """
+    Миксин обработчика, подставляющий асинхронные вью для чтения.
+
+    Маршруты ссылаются на синхронные вью, и под WSGI Django вызывает их
+    напрямую, без async_to_sync. Асинхронная обёртка хранится в атрибуте
+    `async_view` вью и подставляется только обработчиком ASGI для
+    запросов на чтение при включённой настройке ASYNC_READ_VIEWS.
+    """
+
+    def resolve_request(self, request):
+        """Найденное вью с подстановкой асинхронного варианта."""
+        resolver_match = super().resolve_request(request)
+        async_view = getattr(resolver_match.func, 'async_view', None)
+        if (
+            async_view is not None
+            and settings.ASYNC_READ_VIEWS
+            and request.method in READ_METHODS
+        ):
+            resolver_match.func = async_view
+        return resolver_match
+
+
+class AsyncReadASGIHandler(AsyncReadHandlerMixin, ASGIHandler):
+    """Обработчик ASGI с асинхронным чтением (api_yamdb.asgi)."""
+
+
+class AsyncReadRouter(routers.DefaultRouter):
+    """Роутер, добавляющий вью отмеченных вьюсетов async_read_view."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.async_read_viewsets = set()
+
+    def register(self, prefix, viewset, basename=None, async_reads=False):
+        """Регистрация вьюсета; async_reads включает асинхронное чтение."""
+        super().register(prefix, viewset, basename)
+        if async_reads:
+            self.async_read_viewsets.add(viewset)
+
+    def get_urls(self):
+        """Маршруты, вью которых несут асинхронный вариант для ASGI."""
+        urls = super().get_urls()
+        for url in urls:
+            if getattr(url.callback, 'cls', None) in self.async_read_viewsets:
+                url.callback.async_view = async_read_view(url.callback)
+        return urls
@@ -1,9 +1,145 @@
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from reviews.models import Comment
 
+datetime_to_representation = serializers.DateTimeField().to_representation
 
-class BaseCommentSerializer(serializers.ModelSerializer):
+
+def values_list_representation(rows, keys, converters=None):
+    """
+    Словари ответа из кортежей values_list() без ModelSerializer.
+
+    `converters` задаёт преобразование значений отдельных полей, например
+    форматирование дат так же, как это делает DateTimeField.
+    """
+    converters = converters or {}
+    if not converters:
+        return [dict(zip(keys, row)) for row in rows]
+    indexed = [
+        (index, converters[key]) for index, key in enumerate(keys)
+        if key in converters
+    ]
+    data = []
+    for row in rows:
+        row = list(row)
+        for index, convert in indexed:
+            row[index] = convert(row[index])
+        data.append(dict(zip(keys, row)))
+    return data
+
+
+def is_top_level(serializer):
+    """Сериализатор не вложен в другой сериализатор."""
+    parent = serializer.parent
+    if isinstance(parent, serializers.ListSerializer):
+        parent = parent.parent
+    return parent is None
+
+
+class SparseFieldsMixin:
+    """
+    Миксин сериализатора, оставляющий только запрошенные поля.
+
+    Список полей передаётся вьюсетом через контекст (`sparse_fields`)
+    и применяется только к сериализатору верхнего уровня. Поля из
+    `Meta.optional_fields` выводятся только по явному запросу в ?fields=
+    и никогда не выводятся во вложенном сериализаторе.
+    """
+
+    def get_fields(self):
+        """Поля сериализатора с учётом ?fields= и ?omit=."""
+        fields = super().get_fields()
+        sparse_fields = self.context.get('sparse_fields')
+        optional_fields = getattr(self.Meta, 'optional_fields', ())
+        if sparse_fields is None or not is_top_level(self):
+            return {
+                name: field for name, field in fields.items()
+                if name not in optional_fields
+            }
+        return {
+            name: field for name, field in fields.items()
+            if name in sparse_fields
+        }
+
+
+class ExpandFieldsMixin:
+    """
+    Миксин сериализатора, встраивающий связанные объекты по ?expand=.
+
+    Пути разворачивания (например, `reviews` и `reviews.comments`)
+    передаются вьюсетом через контекст (`expand`) для сериализатора
+    верхнего уровня и аргументом `expand` для вложенных. Встраиваемые
+    объекты должны быть заранее выбраны вьюсетом через Prefetch.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+    def get_expandable_fields(self):
+        """Поле -> (класс сериализатора, атрибут с выбранными объектами)."""
+        return {}
+
+    def get_expand(self):
+        """Пути разворачивания для этого сериализатора."""
+        if self.expand is not None:
+            return self.expand
+        if is_top_level(self):
+            return self.context.get('expand') or set()
+        return set()
+
+    def get_fields(self):
+        """Поля сериализатора вместе с развёрнутыми связями."""
+        fields = super().get_fields()
+        expand = self.get_expand()
+        if not expand:
+            return fields
+        for name, (serializer_class, source) in (
+            self.get_expandable_fields().items()
+        ):
+            if name not in expand:
+                continue
+            prefix = f'{name}.'
+            fields[name] = serializer_class(
+                source=source,
+                many=True,
+                read_only=True,
+                expand={
+                    path[len(prefix):] for path in expand
+                    if path.startswith(prefix)
+                },
+            )
+        return fields
+
+
+class BoundedListSerializer(serializers.ListSerializer):
+    """
+    Список с ограничением размера пакета из настроек.
+
+    Размер проверяется до проверки элементов, так что слишком большой
+    пакет отклоняется без разбора каждого объекта и поиска slug.
+    """
+
+    max_size_setting = None
+    max_size_message = 'Не больше {max_size} объектов за один запрос.'
+
+    def to_internal_value(self, data):
+        """Проверка размера пакета перед проверкой элементов."""
+        max_size = getattr(settings, self.max_size_setting)
+        if isinstance(data, list) and len(data) > max_size:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.max_size_message.format(max_size=max_size)
+                ]
+            }, code='max_length')
+        return super().to_internal_value(data)
+
+
+class BaseCommentSerializer(
+    ExpandFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """Базовый сериализатор для Комментариев."""
 
     author = serializers.SlugRelatedField(
@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from reviews.models import Title
+from .renderers import FastJSONRenderer
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:
+    redis = aioredis = None
+
+REVIEW_CREATED = 'review'
+COMMENT_CREATED = 'comment'
+TITLE_EVENTS_PATH = re.compile(r'^/api/v1/titles/(?P<title_id>\d+)/events/$')
+KEEPALIVE_FRAME = b': keepalive\n\n'
+LISTEN_RETRY_SECONDS = 1
+
+logger = logging.getLogger(__name__)
+
+
+def title_channel(title_id):
+    """Канал событий произведения."""
+    return f'title:{title_id}'
+
+
+def format_event(event, event_id, data):
+    """Кадр Server-Sent Events с JSON-данными."""
+    payload = FastJSONRenderer().render(data)
+    return b'event: %s\nid: %s\ndata: %s\n\n' % (
+        event.encode(), event_id.encode(), payload
+    )
+
+
+class Subscription:
+    """
+    Подписка одного соединения на канал.
+
+    Кадры складываются в ограниченную очередь цикла событий подписчика;
+    при переполнении у медленного клиента отбрасываются самые старые.
+    """
+
+    def __init__(self, channel, loop, size):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def put(self, frame):
+        """Кладёт кадр в очередь; вызывается в цикле подписчика."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+
+
+class LocalBroker:
+    """
+    Брокер событий в памяти процесса.
+
+    Публиковать можно из любого потока (синхронные вьюсеты под ASGI
+    работают в пуле потоков): кадр передаётся в цикл событий каждого
+    подписчика через call_soon_threadsafe. События видят только
+    подписчики того же процесса.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Подписка на канал из работающего цикла событий."""
+        subscription = Subscription(
+            channel, asyncio.get_running_loop(), settings.EVENTS_QUEUE_SIZE
+        )
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Отмена подписки при закрытии соединения."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, frame):
+        """Рассылка кадра подписчикам канала."""
+        self.deliver(channel, frame)
+
+    def deliver(self, channel, frame):
+        """Передача кадра подписчикам канала в этом процессе."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.put, frame
+                )
+            except RuntimeError:
+                # Цикл событий уже закрыт, подписка снимется сама.
+                pass
+
+
+class RedisBroker(LocalBroker):
+    """
+    Брокер событий через Redis pub/sub для нескольких процессов.
+
+    Кадры публикуются в Redis, а каждый процесс одной фоновой задачей
+    на цикл событий слушает все каналы и раздаёт кадры своим
+    подписчикам. Требует пакет redis 4.2+ и EVENTS_REDIS_URL.
+    """
+
+    prefix = 'yamdb-events:'
+
+    def __init__(self):
+        if redis is None:
+            raise ImportError('Для RedisBroker нужен пакет redis.')
+        super().__init__()
+        self.client = redis.Redis.from_url(settings.EVENTS_REDIS_URL)
+        self._listeners = {}
+
+    def subscribe(self, channel):
+        """Подписка с запуском слушателя Redis в цикле событий."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._listeners:
+                task = loop.create_task(self.listen())
+                task.add_done_callback(
+                    lambda _: self.forget_listener(loop, task)
+                )
+                self._listeners[loop] = task
+        return super().subscribe(channel)
+
+    def forget_listener(self, loop, task):
+        """
+        Снимает завершившегося слушателя цикла событий.
+
+        Следующая подписка в этом цикле запустит нового слушателя.
+        """
+        with self._lock:
+            if self._listeners.get(loop) is task:
+                del self._listeners[loop]
+
+    def publish(self, channel, frame):
+        """
+        Публикация кадра в Redis для всех процессов.
+
+        Вызывается после фиксации транзакции, поэтому ошибка Redis не
+        должна превращать уже сохранённый отзыв в ответ 500: событие
+        теряется, ошибка пишется в лог.
+        """
+        try:
+            self.client.publish(self.prefix + channel, frame)
+        except redis.RedisError:
+            logger.exception('Не удалось опубликовать событие %s.', channel)
+
+    async def listen(self):
+        """
+        Пересылка кадров из Redis подписчикам этого процесса.
+
+        При разрыве соединения с Redis слушатель переподключается через
+        LISTEN_RETRY_SECONDS; события, опубликованные за это время,
+        подписчики не получат.
+        """
+        while True:
+            try:
+                await self.forward()
+            except redis.RedisError:
+                logger.exception('Соединение слушателя с Redis прервано.')
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+    async def forward(self):
+        """Одно подключение к Redis: раздача кадров до разрыва."""
+        client = aioredis.Redis.from_url(settings.EVENTS_REDIS_URL)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.psubscribe(self.prefix + '*')
+                async for message in pubsub.listen():
+                    if message['type'] != 'pmessage':
+                        continue
+                    channel = message['channel'].decode()[
+                        len(self.prefix):
+                    ]
+                    self.deliver(channel, message['data'])
+        finally:
+            await client.close()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Брокер событий из настройки EVENTS_BROKER."""
+    return import_string(settings.EVENTS_BROKER)()
+
+
+def publish_on_commit(title_id, event, data):
+    """
+    Публикация события произведения после фиксации транзакции.
+
+    Подписчики не увидят объект, создание которого откатилось.
+    """
+    frame = format_event(event, f'{event}-{data["id"]}', data)
+    transaction.on_commit(
+        lambda: get_broker().publish(title_channel(title_id), frame)
+    )
+
+
+async def send_response(send, status, body, content_type):
+    """Отправка короткого ответа целиком."""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type)],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def wait_disconnect(receive):
+    """Ожидание закрытия соединения клиентом."""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def title_events(scope, receive, send, title_id):
+    """
+    ASGI-приложение потока событий произведения (text/event-stream).
+
+    Отдаёт события `review` и `comment` о новых отзывах и комментариях
+    произведения по мере их создания; пока событий нет, раз в
+    EVENTS_KEEPALIVE_SECONDS отправляется комментарий, чтобы прокси не
+    закрывали соединение.
+    """
+    if scope['method'] != 'GET':
+        await send_response(
+            send, HTTPStatus.METHOD_NOT_ALLOWED,
+            b'{"detail":"Method \\"%s\\" not allowed."}'
+            % scope['method'].encode(),
+            b'application/json'
+        )
+        return
+    exists = await sync_to_async(
+        Title.objects.filter(pk=title_id).exists
+    )()
+    if not exists:
+        await send_response(
+            send, HTTPStatus.NOT_FOUND,
+            b'{"detail":"Not found."}', b'application/json'
+        )
+        return
+    broker = get_broker()
+    subscription = broker.subscribe(title_channel(title_id))
+    disconnected = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': HTTPStatus.OK,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'retry: %d\n\n' % settings.EVENTS_RETRY_MILLISECONDS,
+            'more_body': True,
+        })
+        while not disconnected.done():
+            frame = asyncio.ensure_future(subscription.queue.get())
+            await asyncio.wait(
+                (frame, disconnected),
+                timeout=settings.EVENTS_KEEPALIVE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if frame.done():
+                body = frame.result()
+            else:
+                frame.cancel()
+                if disconnected.done():
+                    break
+                body = KEEPALIVE_FRAME
+            await send({
+                'type': 'http.response.body',
+                'body': body,
+                'more_body': True,
+            })
+    finally:
+        broker.unsubscribe(subscription)
+        disconnected.cancel()
+
+
+def events_router(django_application):
+    """
+    ASGI-приложение, отдающее потоки событий в обход Django.
+
+    Долгие соединения event-stream обслуживаются напрямую в цикле
+    событий, остальные запросы и lifespan передаются приложению Django.
+    """
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'http':
+            match = TITLE_EVENTS_PATH.match(scope['path'])
+            if match:
+                await title_events(
+                    scope, receive, send, int(match['title_id'])
+                )
+                return
+        await django_application(scope, receive, send)
+
+    return application
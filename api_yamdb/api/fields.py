@@ -0,0 +1,96 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from reviews.rating_table import get_table
+
+
+class BulkSlugManyRelatedField(ManyRelatedField):
+    """Список slug, разрешаемый за один проход по справочнику."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.to_internal_value_many(data)
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, разрешающий slug через процессный кэш справочника."""
+
+    def __init__(self, reference_cache=None, **kwargs):
+        assert reference_cache is not None, (
+            'The `reference_cache` argument is required.'
+        )
+        self.reference_cache = reference_cache
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            instance = self.reference_cache.get_instance(data)
+        except TypeError:
+            self.fail('invalid')
+        if instance is None:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return instance
+
+    def to_internal_value_many(self, data):
+        """
+        Объекты по списку slug за одну загрузку справочника.
+
+        Ошибка, как и у поштучной проверки, относится к первому
+        неизвестному slug в порядке запроса.
+        """
+        by_slug = self.reference_cache.get_many(data)
+        instances = []
+        for slug in data:
+            try:
+                instance = by_slug.get(slug)
+            except TypeError:
+                self.fail('invalid')
+            if instance is None:
+                self.fail(
+                    'does_not_exist',
+                    slug_name=self.slug_field,
+                    value=smart_str(slug)
+                )
+            instances.append(instance)
+        return instances
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkSlugManyRelatedField(**list_kwargs)
+
+
+class SharedRatingField(serializers.IntegerField):
+    """
+    Рейтинг произведения из общей таблицы процессов (reviews.rating_table).
+
+    Если таблица выключена или в ней нет записи произведения, берётся
+    аннотация `rating` из запроса, а без аннотации — `default`.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        table = get_table()
+        row = table.get(instance.pk) if table is not None else None
+        if row is not None:
+            rating = row[2]
+        else:
+            rating = getattr(instance, 'rating', self.default)
+        if rating is None:
+            return None
+        return super().to_representation(rating)
@@ -9,6 +9,7 @@ class TitlesFilter(filters.FilterSet):
     genre = filters.CharFilter(
         field_name='genre__slug',
         lookup_expr='icontains',
+        distinct=True,
     )
     category = filters.CharFilter(
         field_name='category__slug',
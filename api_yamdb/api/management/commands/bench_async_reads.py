@@ -0,0 +1,153 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+
+from api_yamdb.asgi import application
+from reviews.models import Category, Genre, Title, Tombstone
+
+TITLES_URL = '/api/v1/titles/'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение пропускной способности при множестве медленных '
+        'клиентов: WSGI с фиксированным числом потоков, ASGI с синхронными '
+        'вью и ASGI с асинхронным чтением. Медленный клиент читает ответ '
+        '--delay секунд. Данные создаются в БД и удаляются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50)
+        parser.add_argument('--delay', type=float, default=0.2)
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков WSGI-сервера.'
+        )
+        parser.add_argument('--titles', type=int, default=20)
+
+    def handle(self, *args, **options):
+        clients, delay = options['clients'], options['delay']
+        title_ids = self.create_titles(options['titles'])
+        try:
+            cases = (
+                (f'WSGI, {options["workers"]} потоков',
+                 lambda: self.run_wsgi(clients, delay, options['workers'])),
+                ('ASGI, синхронные вью',
+                 lambda: self.run_asgi(clients, delay, False)),
+                ('ASGI, асинхронное чтение',
+                 lambda: self.run_asgi(clients, delay, True)),
+            )
+            self.stdout.write(
+                f'{clients} клиентов, чтение ответа {delay * 1000:.0f} мс:'
+            )
+            for name, run in cases:
+                wall, latencies = run()
+                self.stdout.write(
+                    f'{name:>26}: {clients / wall:8.1f} запросов/с, '
+                    f'задержка p50 {statistics.median(latencies) * 1000:7.1f}'
+                    f' мс, max {max(latencies) * 1000:7.1f} мс'
+                )
+        finally:
+            self.delete_titles(title_ids)
+
+    def run_wsgi(self, clients, delay, workers):
+        """
+        Модель WSGI: поток занят запросом, пока клиент читает ответ.
+
+        Передача ответа медленному клиенту имитируется паузой в потоке.
+        """
+        started = time.perf_counter()
+
+        def request():
+            try:
+                Client().get(TITLES_URL)
+                time.sleep(delay)
+                return time.perf_counter() - started
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(
+                lambda _: request(), range(clients)
+            ))
+        return time.perf_counter() - started, latencies
+
+    def run_asgi(self, clients, delay, async_reads):
+        """Модель ASGI: медленный клиент занимает только корутину."""
+        with override_settings(ASYNC_READ_VIEWS=async_reads):
+            return asyncio.run(self.gather_asgi(clients, delay))
+
+    async def gather_asgi(self, clients, delay):
+        """Одновременные запросы к ASGI-приложению."""
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(
+            self.asgi_request(delay, started) for _ in range(clients)
+        ))
+        return time.perf_counter() - started, latencies
+
+    async def asgi_request(self, delay, started):
+        """Запрос к ASGI-приложению клиента, медленно читающего ответ."""
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': TITLES_URL,
+            'raw_path': TITLES_URL.encode(),
+            'query_string': b'',
+            'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b''}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if (
+                message['type'] == 'http.response.body'
+                and not message.get('more_body')
+            ):
+                await asyncio.sleep(delay)
+
+        await application(scope, receive, send)
+        return time.perf_counter() - started
+
+    def create_titles(self, count):
+        """Создаёт произведения с категорией и жанром для замера."""
+        category = Category.objects.create(
+            name='bench async', slug='bench-async'
+        )
+        genre = Genre.objects.create(name='bench async', slug='bench-async')
+        Title.objects.bulk_create(
+            Title(name=f'bench async {i}', year=2000, category=category)
+            for i in range(count)
+        )
+        title_ids = list(Title.objects.filter(
+            category=category
+        ).values_list('pk', flat=True))
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=pk, genre_id=genre.pk)
+            for pk in title_ids
+        )
+        return title_ids
+
+    def delete_titles(self, title_ids):
+        """Удаляет данные замера вместе с отметками об удалении."""
+        Title.objects.filter(pk__in=title_ids).delete()
+        Tombstone.objects.filter(
+            kind=Tombstone.TITLE, object_id__in=title_ids
+        ).delete()
+        Category.objects.filter(slug='bench-async').delete()
+        Genre.objects.filter(slug='bench-async').delete()
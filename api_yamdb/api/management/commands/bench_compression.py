@@ -0,0 +1,92 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from api.middleware import brotli, compress_content
+from reviews.models import Category, Genre, Title
+
+TITLES_URL = '/api/v1/titles/'
+WORDS = (
+    'герой', 'город', 'ночь', 'война', 'любовь', 'дорога', 'тайна', 'море',
+    'время', 'друг', 'письмо', 'сон', 'поезд', 'зима', 'огонь', 'музыка',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк сжатия списка произведений: размер ответа и CPU на запрос '
+        'без сжатия, с gzip и с brotli. Данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--description-length', type=int, default=600)
+
+    def handle(self, *args, **options):
+        encodings = ['identity', 'gzip']
+        if brotli is not None:
+            encodings.append('br')
+        with transaction.atomic():
+            self.create_titles(
+                options['titles'], options['description_length']
+            )
+            client = Client()
+            requests = options['requests']
+            body = client.get(TITLES_URL).content
+            self.stdout.write(f'GET {TITLES_URL}, {requests} запросов:')
+            for encoding in encodings:
+                size, cpu = self.measure(client, encoding, requests)
+                compress_cpu = self.measure_compression(
+                    body, encoding, requests
+                )
+                self.stdout.write(
+                    f'{encoding:>9}: {size:7d} байт '
+                    f'(-{100 * (1 - size / len(body)):4.1f}%)  '
+                    f'запрос {cpu:6.3f} мс CPU, '
+                    f'из них сжатие {compress_cpu:6.3f} мс'
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, client, encoding, requests):
+        """Размер тела ответа и среднее CPU-время запроса в мс."""
+        started = time.process_time()
+        for _ in range(requests):
+            response = client.get(
+                TITLES_URL, HTTP_ACCEPT_ENCODING=encoding
+            )
+        elapsed = time.process_time() - started
+        return len(response.content), elapsed * 1000 / requests
+
+    def measure_compression(self, body, encoding, requests):
+        """Среднее CPU-время сжатия тела ответа в мс."""
+        if encoding == 'identity':
+            return 0.0
+        started = time.process_time()
+        for _ in range(requests):
+            compress_content(body, encoding)
+        return (time.process_time() - started) * 1000 / requests
+
+    def create_titles(self, count, description_length):
+        """Произведения с описаниями и жанрами для бенчмарка."""
+        category = Category.objects.create(name='bench', slug='bench')
+        Genre.objects.bulk_create(
+            Genre(name=f'bench genre {i}', slug=f'bench-genre-{i}')
+            for i in range(3)
+        )
+        genres = list(Genre.objects.filter(slug__startswith='bench-'))
+        rng = random.Random(0)
+        for i in range(count):
+            words = []
+            while sum(len(word) + 1 for word in words) < description_length:
+                words.append(rng.choice(WORDS))
+            title = Title.objects.create(
+                name=f'bench title {i}',
+                year=2000,
+                category=category,
+                description=' '.join(words),
+            )
+            title.genre.set(genres)
@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.base_serializers import (datetime_to_representation,
+                                  values_list_representation)
+from api.mixins import CommentMixin, CreateListDestroyViewset, ReviewMixin
+from api.serializers import (CommentSerializer, GenreSerializer,
+                             ReviewSerializer)
+from reviews.models import Comment, Genre, Review, Title
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Микробенчмарк сериализации списков: ModelSerializer против '
+        'values_list(). Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        with transaction.atomic():
+            self.create_rows(rows)
+            cases = (
+                ('genres', Genre.objects.all(), GenreSerializer,
+                 {key: key for key in
+                  CreateListDestroyViewset.reference_cache_fields}, {}),
+                ('reviews', Review.objects.select_related('author'),
+                 ReviewSerializer, ReviewMixin.values_list_fields,
+                 {'pub_date': datetime_to_representation}),
+                ('comments', Comment.objects.select_related('author'),
+                 CommentSerializer, CommentMixin.values_list_fields,
+                 {'pub_date': datetime_to_representation}),
+            )
+            self.stdout.write(
+                f'CPU-время на 1000 строк, мс (лучшее из {repeat}):'
+            )
+            for name, queryset, serializer_class, fields, converters in cases:
+                before = self.measure(
+                    lambda: serializer_class(
+                        list(queryset.all()), many=True
+                    ).data,
+                    rows, repeat
+                )
+                keys = list(fields)
+                after = self.measure(
+                    lambda: values_list_representation(
+                        list(queryset.values_list(*fields.values())),
+                        keys, converters
+                    ),
+                    rows, repeat
+                )
+                self.stdout.write(
+                    f'{name:>10}: ModelSerializer {before:8.2f}  '
+                    f'values_list {after:8.2f}  x{before / after:.1f}'
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, func, rows, repeat):
+        """Лучшее CPU-время вызова в миллисекундах на 1000 строк."""
+        best = None
+        for _ in range(repeat):
+            started = time.process_time()
+            func()
+            elapsed = time.process_time() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000 * 1000 / rows
+
+    def create_rows(self, rows):
+        """Создаёт по `rows` жанров, отзывов и комментариев."""
+        Genre.objects.bulk_create(
+            Genre(name=f'bench genre {i}', slug=f'bench-genre-{i}')
+            for i in range(rows)
+        )
+        User.objects.bulk_create(
+            User(username=f'bench-user-{i}', email=f'bench{i}@yamdb.fake')
+            for i in range(rows)
+        )
+        authors = list(User.objects.filter(username__startswith='bench-'))
+        title = Title.objects.create(name='bench title', year=2000)
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='bench review', score=5)
+            for author in authors
+        )
+        review = Review.objects.filter(title=title).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='bench comment')
+            for author in authors
+        )
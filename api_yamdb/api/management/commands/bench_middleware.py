@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from reviews.models import Genre
+
+GENRES_URL = '/api/v1/genres/'
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение накладных расходов полного стека middleware и стека, '
+        'пропускающего сессии, CSRF, сообщения и clickjacking для API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        with transaction.atomic():
+            Genre.objects.create(name='bench', slug='bench')
+            stacks = (
+                ('полный стек', FULL_MIDDLEWARE),
+                ('стек для API', settings.MIDDLEWARE),
+            )
+            best = {}
+            # Стеки чередуются, из раундов берётся лучший результат.
+            for _ in range(options['rounds']):
+                for name, middleware in stacks:
+                    with override_settings(MIDDLEWARE=middleware):
+                        wall, cpu = self.measure(Client(), requests)
+                    previous = best.get(name, (wall, cpu))
+                    best[name] = (min(wall, previous[0]),
+                                  min(cpu, previous[1]))
+            results = []
+            for name, _ in stacks:
+                wall, cpu = best[name]
+                results.append((wall, cpu))
+                self.stdout.write(
+                    f'{name:>13}: {wall:7.1f} мкс/запрос, '
+                    f'CPU {cpu:7.1f} мкс/запрос'
+                )
+            (full_wall, full_cpu), (lean_wall, lean_cpu) = results
+            self.stdout.write(
+                f'сэкономлено: {full_wall - lean_wall:7.1f} мкс/запрос, '
+                f'CPU {full_cpu - lean_cpu:7.1f} мкс/запрос'
+            )
+            transaction.set_rollback(True)
+
+    def measure(self, client, requests):
+        """Среднее время запроса к списку жанров в микросекундах."""
+        client.get(GENRES_URL)
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        for _ in range(requests):
+            client.get(GENRES_URL)
+        cpu = time.process_time() - cpu_started
+        wall = time.perf_counter() - wall_started
+        return wall * 1e6 / requests, cpu * 1e6 / requests
@@ -0,0 +1,187 @@
+import gzip
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODING_BROTLI = 'br'
+ENCODING_GZIP = 'gzip'
+GZIP_FASTEST_LEVEL = 1
+BROTLI_FASTEST_QUALITY = 0
+SKIP_COMPRESSION_STATUSES = (
+    HTTPStatus.NO_CONTENT,
+    HTTPStatus.NOT_MODIFIED,
+)
+
+
+def parse_accept_encoding(header):
+    """Веса q кодировок из Accept-Encoding."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def available_encodings():
+    """Поддерживаемые кодировки в порядке предпочтения сервера."""
+    if brotli is not None:
+        return (ENCODING_BROTLI, ENCODING_GZIP)
+    return (ENCODING_GZIP,)
+
+
+def choose_encoding(header):
+    """
+    Кодировка с наибольшим весом q среди доступных.
+
+    Кодировка без собственного веса получает вес `*`. При равных весах
+    выбирается brotli (если установлен), затем gzip. Если клиент
+    предпочитает identity всем доступным кодировкам, ответ не сжимается.
+    """
+    accepted = parse_accept_encoding(header)
+    default = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    if best is not None and accepted.get('identity', 0.0) > best_quality:
+        return None
+    return best
+
+
+def compress_content(content, encoding, fast=False):
+    """
+    Сжимает тело ответа.
+
+    При `fast=True` используется самый быстрый уровень сжатия: так
+    снижается процессорное время на большие ответы.
+    """
+    if encoding == ENCODING_BROTLI:
+        quality = (
+            BROTLI_FASTEST_QUALITY if fast
+            else settings.COMPRESSION_BROTLI_QUALITY
+        )
+        return brotli.compress(content, quality=quality)
+    level = GZIP_FASTEST_LEVEL if fast else settings.COMPRESSION_GZIP_LEVEL
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжатие ответов gzip или brotli по заголовку Accept-Encoding.
+
+    Сжимаются только ответы длиной от COMPRESSION_MIN_LENGTH до
+    COMPRESSION_MAX_LENGTH; ответы 204, 304, потоковые и уже сжатые
+    пропускаются. Ответы длиннее COMPRESSION_FAST_LENGTH сжимаются самым
+    быстрым уровнем. Так время CPU на сжатие одного ответа ограничено
+    временем сжатия COMPRESSION_MAX_LENGTH байт этим уровнем.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.status_code in SKIP_COMPRESSION_STATUSES
+            or response.has_header('Content-Encoding')
+            or not (
+                settings.COMPRESSION_MIN_LENGTH
+                <= len(response.content)
+                <= settings.COMPRESSION_MAX_LENGTH
+            )
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        content = response.content
+        compressed = compress_content(
+            content,
+            encoding,
+            fast=len(content) > settings.COMPRESSION_FAST_LENGTH
+        )
+        if len(compressed) >= len(content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def is_api_request(request):
+    """Запрос к API, аутентифицированному только через JWT."""
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class SkipForAPIMixin:
+    """
+    Миксин middleware, который не выполняется для запросов к API.
+
+    Сессии, CSRF, сообщения и защита от clickjacking нужны только
+    админке и HTML-страницам, а не JSON API с JWT-аутентификацией.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionSkipAPIMiddleware(SkipForAPIMixin, SessionMiddleware):
+    """SessionMiddleware без загрузки сессии для API."""
+
+
+class CsrfViewSkipAPIMiddleware(SkipForAPIMixin, CsrfViewMiddleware):
+    """CsrfViewMiddleware без проверок для API."""
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class AuthenticationSkipAPIMiddleware(
+    SkipForAPIMixin, AuthenticationMiddleware
+):
+    """AuthenticationMiddleware без пользователя из сессии для API."""
+
+
+class MessageSkipAPIMiddleware(SkipForAPIMixin, MessageMiddleware):
+    """MessageMiddleware без хранилища сообщений для API."""
+
+
+class XFrameOptionsSkipAPIMiddleware(
+    SkipForAPIMixin, XFrameOptionsMiddleware
+):
+    """XFrameOptionsMiddleware без заголовка X-Frame-Options для API."""
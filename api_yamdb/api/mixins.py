@@ -1,8 +1,23 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework import filters, mixins, viewsets
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import HttpRequest, QueryDict
+from django.utils.functional import cached_property
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from .pagination import UserPagination
+from reviews import cache_versions
+from reviews.models import Comment, LeaderboardEntry
+from .base_serializers import (datetime_to_representation,
+                               values_list_representation)
+from .pagination import FeedCursorPagination, UserPagination
 from .permissions import CommentPermission, IsAdmin, IsStaffOrOwner
 from .serializers import (
     ProfileSerializer,
@@ -10,11 +25,342 @@ from .serializers import (
     ReviewSerializer,
     CommentSerializer
 )
+from .singleflight import MISSING, get_or_compute
 
 User = get_user_model()
 
 
+def parse_field_list(value):
+    """Разбор списка полей из параметра запроса вида `a,b,c`."""
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsViewMixin:
+    """
+    Миксин выборочных полей (?fields=, ?omit=) для list и retrieve.
+
+    Кроме сокращения ответа сужает выборку: в `.only()` попадают колонки
+    только запрошенных полей, а select_related, prefetch_related и
+    аннотации для неподходящих полей не выполняются.
+    """
+
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    sparse_fields_actions = ('list', 'retrieve')
+    # Поле сериализатора -> колонки модели для `.only()`.
+    sparse_fields_only = {}
+    # Поле сериализатора -> связи для select_related / prefetch_related.
+    sparse_fields_select = {}
+    sparse_fields_prefetch = {}
+    # Поле сериализатора -> аннотации, необходимые для его вывода.
+    sparse_fields_annotate = {}
+
+    @cached_property
+    def sparse_fields(self):
+        """Запрошенные поля сериализатора или None, если выбраны все."""
+        if self.action not in self.sparse_fields_actions:
+            return None
+        params = self.request.query_params
+        fields = parse_field_list(params.get(self.fields_query_param, ''))
+        omit = parse_field_list(params.get(self.omit_query_param, ''))
+        if not fields and not omit:
+            return None
+        optional = self.optional_fields
+        return {
+            name for name in self.get_sparse_field_names()
+            if (name in fields if fields else name not in optional)
+            and name not in omit
+        }
+
+    def get_sparse_field_names(self):
+        """Поля, которые можно выбрать в ?fields= и исключить в ?omit=."""
+        return set(self.get_serializer_class()().fields) | self.optional_fields
+
+    @cached_property
+    def optional_fields(self):
+        """Поля, которые выводятся только по явному запросу в ?fields=."""
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        return set(getattr(meta, 'optional_fields', ()))
+
+    def get_serializer_context(self):
+        """Передаёт выбранные поля в сериализатор."""
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.sparse_fields
+        return context
+
+    def filter_queryset(self, queryset):
+        """Сужает выборку под запрошенные поля."""
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.sparse_fields_actions:
+            return queryset
+        return self.narrow_queryset(queryset)
+
+    def is_field_requested(self, name):
+        """Поле сериализатора попадёт в ответ."""
+        if self.sparse_fields is None:
+            return name not in self.optional_fields
+        return name in self.sparse_fields
+
+    def narrow_queryset(self, queryset):
+        """Применяет only(), связи и аннотации запрошенных полей."""
+        for name, lookups in self.sparse_fields_select.items():
+            if self.is_field_requested(name):
+                queryset = queryset.select_related(*lookups)
+        for name, lookups in self.sparse_fields_prefetch.items():
+            if self.is_field_requested(name):
+                queryset = queryset.prefetch_related(*lookups)
+        for name, annotations in self.sparse_fields_annotate.items():
+            if self.is_field_requested(name):
+                queryset = queryset.annotate(**annotations)
+        if self.sparse_fields is not None:
+            columns = set()
+            for name in self.sparse_fields:
+                columns.update(self.sparse_fields_only.get(name, ()))
+            queryset = queryset.only('pk', *columns)
+        return queryset
+
+
+def limited_prefetch(lookup, queryset, parent_field, to_attr, limit,
+                     ordering=('pub_date', 'pk')):
+    """
+    Prefetch первых `limit` объектов для каждого родителя.
+
+    Ограничение накладывается коррелированным подзапросом по
+    `parent_field`, поэтому объекты всех родителей выбираются одним
+    запросом, а не запросом на родителя.
+    """
+    model = queryset.model
+    first_ids = model.objects.filter(
+        **{parent_field: OuterRef(parent_field)}
+    ).order_by(*ordering).values('pk')[:limit]
+    return Prefetch(
+        lookup,
+        queryset=queryset.filter(pk__in=Subquery(first_ids)).order_by(
+            *ordering
+        ),
+        to_attr=to_attr,
+    )
+
+
+class ExpandMixin:
+    """
+    Миксин встраивания связанных объектов в ответ (?expand=).
+
+    Для каждого пути (`reviews`, `reviews.comments`) в `expand_prefetches`
+    заданы аргументы `limited_prefetch`: встраивается первая страница
+    связанных объектов, и на каждый уровень вложенности приходится один
+    запрос независимо от числа родителей. Связь, не попавшая в ?fields=
+    или исключённая в ?omit=, не разворачивается. Используется вместе с
+    SparseFieldsViewMixin.
+    """
+
+    expand_query_param = 'expand'
+    expand_actions = ('list', 'retrieve')
+    # Путь разворачивания -> аргументы limited_prefetch() без limit.
+    expand_prefetches = {}
+
+    @cached_property
+    def expand(self):
+        """Запрошенные пути разворачивания вместе с родительскими."""
+        if self.action not in self.expand_actions:
+            return set()
+        requested = parse_field_list(
+            self.request.query_params.get(self.expand_query_param, '')
+        )
+        expand = set()
+        for path in requested & set(self.expand_prefetches):
+            parts = path.split('.')
+            if not self.is_field_requested(parts[0]):
+                continue
+            expand.update(
+                '.'.join(parts[:depth]) for depth in range(1, len(parts) + 1)
+            )
+        return expand
+
+    def get_sparse_field_names(self):
+        """Развёрнутые связи тоже выбираются в ?fields= и ?omit=."""
+        return super().get_sparse_field_names() | {
+            path.split('.')[0] for path in self.expand_prefetches
+        }
+
+    def get_serializer_context(self):
+        """Передаёт пути разворачивания в сериализатор."""
+        context = super().get_serializer_context()
+        context['expand'] = self.expand
+        return context
+
+    def filter_queryset(self, queryset):
+        """Добавляет Prefetch для запрошенных путей разворачивания."""
+        queryset = super().filter_queryset(queryset)
+        for path in sorted(self.expand, key=lambda path: path.count('.')):
+            queryset = queryset.prefetch_related(limited_prefetch(
+                limit=api_settings.PAGE_SIZE, **self.expand_prefetches[path]
+            ))
+        return queryset
+
+    def can_use_values_list(self):
+        """Развёрнутые связи требуют сериализатора."""
+        return not self.expand and super().can_use_values_list()
+
+
+class RefreshRequest(HttpRequest):
+    """
+    Анонимный GET-запрос для фонового пересчёта кэша ответа.
+
+    Собирается из неизменяемых частей исходного запроса: пути, строки
+    запроса, схемы и заголовков хоста, без авторизации и cookie.
+    """
+
+    # Заголовки, от которых зависят ссылки в ответе (пагинация).
+    copied_meta = (
+        'HTTP_HOST', 'SERVER_NAME', 'SERVER_PORT',
+        'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PORT',
+        'HTTP_X_FORWARDED_PROTO',
+    )
+
+    def __init__(self, path, query_string, scheme, meta):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META = {'QUERY_STRING': query_string, **meta}
+        self.GET = QueryDict(query_string)
+        self.response_cache_refresh = True
+        self._scheme = scheme
+
+    @classmethod
+    def copy(cls, request):
+        """Параметры для пересчёта, скопированные из запроса."""
+        return (
+            request.path,
+            request.META.get('QUERY_STRING', ''),
+            request.scheme,
+            {
+                name: request.META[name]
+                for name in cls.copied_meta if name in request.META
+            },
+        )
+
+    def _get_scheme(self):
+        return self._scheme
+
+
+class ResponseCacheMixin:
+    """
+    Миксин вьюсета, кэширующий данные ответов в общем кэше.
+
+    Ключ включает версии из reviews.cache_versions, которые меняются
+    сигналами при изменении данных, и полный путь запроса. Промахи
+    объединяются (api.singleflight): одновременные запросы ждут одного
+    вычисления, а устаревшее значение отдаётся, пока идёт пересчёт.
+    """
+
+    # Действие -> функция (вьюсет) -> имена версий кэша или None, если
+    # этот запрос не кэшируется.
+    response_cache_versions = {}
+    # Параметры, с которыми ответ не кэшируется.
+    response_cache_skip_params = ()
+
+    def get_response_cache_key(self):
+        """Ключ кэша ответа или None, если ответ не кэшируется."""
+        get_versions = self.response_cache_versions.get(self.action)
+        if getattr(self.request, 'response_cache_refresh', False):
+            # Фоновый пересчёт вычисляет ответ, а не читает кэш.
+            return None
+        if get_versions is None or any(
+            param in self.request.query_params
+            for param in self.response_cache_skip_params
+        ):
+            return None
+        names = get_versions(self)
+        if names is None:
+            return None
+        versions = cache_versions.get_versions(*names)
+        digest = hashlib.md5(
+            self.request.get_full_path().encode()
+        ).hexdigest()
+        return 'response:{}:{}:{}'.format(
+            self.basename, ':'.join(map(str, versions)), digest
+        )
+
+    def cached_response(self, compute):
+        """Ответ с данными из кэша или из `compute()`."""
+        key = self.get_response_cache_key()
+        if key is None:
+            return compute()
+        return Response(get_or_compute(
+            key, lambda: compute().data, self.get_response_refresh()
+        ))
+
+    def get_response_refresh(self):
+        """
+        Пересчёт данных ответа для фонового потока.
+
+        Основной поток ещё отрисовывает ответ с этими вью и запросом,
+        поэтому фоновый поток выполняет новый вью того же класса на
+        копии запроса (RefreshRequest), а не повторно вызывает текущий.
+        """
+        view = type(self).as_view(
+            dict(self.action_map), basename=self.basename, detail=self.detail
+        )
+        request_args = RefreshRequest.copy(self.request)
+        kwargs = dict(self.kwargs)
+
+        def refresh():
+            response = view(RefreshRequest(*request_args), **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                # Например, произведение уже удалено: ошибку не кэшируем.
+                return MISSING
+            return response.data
+
+        return refresh
+
+
+class ValuesListMixin(SparseFieldsViewMixin):
+    """
+    Быстрый list через values_list().
+
+    Строки выбираются кортежами и собираются в словари той же формы,
+    что отдаёт сериализатор, минуя создание моделей и ModelSerializer.
+    """
+
+    # Поле ответа -> путь для values_list(), в порядке полей сериализатора.
+    values_list_fields = {}
+    # Поле ответа -> функция преобразования значения.
+    values_list_converters = {}
+
+    def list(self, request, *args, **kwargs):
+        """Список объектов без ModelSerializer."""
+        if not self.can_use_values_list():
+            return super().list(request, *args, **kwargs)
+        keys = [
+            key for key in self.values_list_fields
+            if self.is_field_requested(key)
+        ]
+        rows = self.get_values_list_rows(keys)
+        page = self.paginate_queryset(rows)
+        data = values_list_representation(
+            rows if page is None else page,
+            keys,
+            self.values_list_converters
+        )
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def can_use_values_list(self):
+        """Список можно собрать из values_list()."""
+        return True
+
+    def get_values_list_rows(self, keys):
+        """Кортежи значений полей `keys` для списка."""
+        return self.filter_queryset(self.get_queryset()).values_list(
+            *(self.values_list_fields[key] for key in keys)
+        )
+
+
 class CreateListDestroyViewset(
+    ResponseCacheMixin,
+    ValuesListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -26,21 +372,180 @@ class CreateListDestroyViewset(
     search_fields = ('name',)
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
+    sparse_fields_only = {
+        'name': ('name',),
+        'slug': ('slug',),
+        'title_count': ('title_count',),
+    }
+    values_list_fields = {
+        'name': 'name',
+        'slug': 'slug',
+        'title_count': 'title_count',
+    }
+    # Процессный кэш справочника (reviews.reference), из которого
+    # отдаётся список без поиска, и поля, которые в нём хранятся.
+    reference_cache = None
+    reference_cache_fields = ('name', 'slug')
+    # Тип топа произведений (LeaderboardEntry.scope_type) для ../top/.
+    leaderboard_scope = None
+    response_cache_versions = {
+        'top': lambda view: (cache_versions.LEADERBOARDS,),
+    }
+
+    def get_values_list_rows(self, keys):
+        """Строки списка из кэша справочника, если нет поиска."""
+        search_param = filters.SearchFilter.search_param
+        if (
+            self.reference_cache is None
+            or self.request.query_params.get(search_param)
+            or not set(keys) <= set(self.reference_cache_fields)
+        ):
+            return super().get_values_list_rows(keys)
+        fields = list(self.reference_cache_fields)
+        indexes = [fields.index(key) for key in keys]
+        return [
+            tuple(row[index] for index in indexes)
+            for row in self.reference_cache.rows()
+        ]
+
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk_create(self, request):
+        """Массовое создание из списка одним INSERT."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+            if self.reference_cache is not None:
+                self.reference_cache.invalidate_on_commit()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Массовое удаление по списку slug из параметра ?slugs=a,b,c.
+
+        В ответе — число удалённых объектов и slug, которых не нашлось.
+        """
+        slugs = parse_field_list(request.query_params.get('slugs', ''))
+        if not slugs:
+            raise ValidationError({'slugs': 'Не передан список slug.'})
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(slug__in=slugs)
+            found = set(queryset.values_list('slug', flat=True))
+            self.perform_bulk_destroy(queryset)
+        return Response({
+            'deleted': len(found),
+            'missing': sorted(slugs - found),
+        })
+
+    def perform_bulk_destroy(self, queryset):
+        """Удаление объектов выборки."""
+        queryset.delete()
+
+    @action(detail=True, methods=('get',))
+    def top(self, request, slug=None):
+        """
+        Лучшие по средней оценке произведения категории или жанра.
+
+        Отдаются из материализованного топа одним диапазонным запросом
+        по индексу; число мест задаётся параметром ?limit=.
+        """
+        entry = self.reference_cache.get(slug)
+        if entry is None:
+            raise NotFound()
+        return self.cached_response(lambda: self.get_top_response(entry[0]))
 
+    def get_top_response(self, scope_id):
+        """Ответ топа по материализованным местам."""
+        rows = LeaderboardEntry.objects.filter(
+            scope_type=self.leaderboard_scope, scope_id=scope_id
+        ).order_by('-rating', 'title_id').values_list(
+            'title_id', 'title__name', 'title__year', 'rating'
+        )[:self.get_top_limit()]
+        return Response({'results': [
+            {
+                'position': position,
+                'id': title_id,
+                'name': name,
+                'year': year,
+                'rating': rating,
+            }
+            for position, (title_id, name, year, rating)
+            in enumerate(rows, 1)
+        ]})
 
-class CommentMixin(viewsets.ModelViewSet):
+    def get_top_limit(self):
+        """Число мест в ответе из ?limit=, не больше размера топа."""
+        limit = self.request.query_params.get('limit')
+        if limit is None:
+            return settings.LEADERBOARD_SIZE
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        if not 1 <= limit <= settings.LEADERBOARD_SIZE:
+            raise ValidationError({
+                'limit': f'Допустимо от 1 до {settings.LEADERBOARD_SIZE}.'
+            })
+        return limit
+
+
+class CommentMixin(ValuesListMixin, viewsets.ModelViewSet):
     """Миксин для комментариев."""
 
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = [CommentPermission]
     serializer_class = CommentSerializer
+    sparse_fields_only = {
+        'author': ('author__username',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+    }
+    sparse_fields_select = {'author': ('author',)}
+    values_list_fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }
+    values_list_converters = {'pub_date': datetime_to_representation}
 
 
-class ReviewMixin(viewsets.ModelViewSet):
+class ReviewMixin(ExpandMixin, ValuesListMixin, viewsets.ModelViewSet):
     """Миксин для отзывов."""
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = [CommentPermission]
     serializer_class = ReviewSerializer
+    sparse_fields_only = {
+        'author': ('author__username',),
+        'text': ('text',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'comment_count': ('comment_count',),
+        'last_comment_at': ('last_comment_at',),
+    }
+    sparse_fields_select = {'author': ('author',)}
+    values_list_fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+        'comment_count': 'comment_count',
+        'last_comment_at': 'last_comment_at',
+    }
+    values_list_converters = {
+        'pub_date': datetime_to_representation,
+        'last_comment_at': datetime_to_representation,
+    }
+    expand_prefetches = {
+        'comments': {
+            'lookup': 'comments',
+            'queryset': Comment.objects.select_related('author'),
+            'parent_field': 'review_id',
+            'to_attr': 'expanded_comments',
+        },
+    }
 
 
 class ProfileMixins(
@@ -58,7 +563,24 @@ class ProfileMixins(
         return self.request.user
 
 
+class AuthorFeedMixin(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Миксин ленты записей текущего пользователя по всем произведениям.
+
+    Выборка идёт по индексу (author, pub_date) с курсорной пагинацией,
+    связанные объекты выбираются через select_related.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    pagination_class = FeedCursorPagination
+
+    def get_queryset(self):
+        """Записи текущего пользователя."""
+        return super().get_queryset().filter(author=self.request.user)
+
+
 class UserMixins(
+    SparseFieldsViewMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -76,3 +598,6 @@ class UserMixins(
     search_fields = ['username']
     lookup_field = 'username'
     http_method_names = ['get', 'patch', 'delete', 'post']
+    sparse_fields_only = {
+        name: (name,) for name in UserSerializer.Meta.fields
+    }
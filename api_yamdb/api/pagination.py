@@ -1,9 +1,216 @@
+import base64
+import binascii
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.dateparse import parse_datetime
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+
+COUNT_EXACT = 'exact'
+COUNT_SKIP = 'skip'
+COUNT_APPROX = 'approx'
+COUNT_SKIP_VALUES = ('false', '0', 'no', 'off')
+COUNT_CACHE_PREFIX = 'pagination-count'
+
+
+class CountlessPage:
+    """Страница, границы которой определены без SELECT COUNT(*)."""
+
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class OptionalCountPagination(pagination.PageNumberPagination):
+    """
+    Постраничная пагинация с необязательным подсчётом количества объектов.
+
+    По умолчанию поведение совпадает с PageNumberPagination.
+    ``?count=false`` отключает COUNT(*): выбирается page_size + 1 строк,
+    лишняя строка показывает, есть ли следующая страница.
+    ``?count=approx`` работает так же, но дополнительно отдаёт
+    закэшированное приближённое количество, которое обновляется в фоне.
+    """
+
+    count_query_param = 'count'
+
+    def get_count_mode(self, request):
+        """Режим подсчёта количества объектов из параметров запроса."""
+        value = request.query_params.get(self.count_query_param, '').lower()
+        if value in COUNT_SKIP_VALUES:
+            return COUNT_SKIP
+        if value == COUNT_APPROX:
+            return COUNT_APPROX
+        return COUNT_EXACT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Разбивка на страницы с учётом режима подсчёта."""
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == COUNT_EXACT:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        page_number = self.get_countless_page_number(request)
+        offset = (page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and page_number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.page = CountlessPage(
+            rows[:page_size], page_number, len(rows) > page_size
+        )
+        self.approximate_count = None
+        if self.count_mode == COUNT_APPROX:
+            self.approximate_count = get_approximate_count(queryset)
+        self.request = request
+        return list(self.page)
+
+    def get_countless_page_number(self, request):
+        """Номер страницы; `last` без подсчёта количества не поддержан."""
+        try:
+            page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message)
+        if page_number < 1:
+            raise NotFound(self.invalid_page_message)
+        return page_number
 
+    def get_paginated_response(self, data):
+        """Ответ без ключа `count`, если подсчёт был отключён."""
+        if self.count_mode == COUNT_EXACT:
+            return super().get_paginated_response(data)
+        payload = OrderedDict()
+        if self.count_mode == COUNT_APPROX:
+            payload['count'] = self.approximate_count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
 
-class UserPagination(pagination.PageNumberPagination):
+
+class UserPagination(OptionalCountPagination):
     """Класс пагинации для пользователя."""
 
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class FeedCursorPagination(pagination.CursorPagination):
+    """
+    Курсорная пагинация лент от новых записей к старым.
+
+    Страница выбирается условием по (pub_date, id) вместо OFFSET, поэтому
+    её стоимость не растёт с глубиной ленты.
+    """
+
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def encode_change_cursor(key):
+    """Непрозрачный курсор ленты изменений из ключа (время, ранг, id)."""
+    changed_at, rank, pk = key
+    raw = f'{changed_at.isoformat()}|{rank}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_change_cursor(value):
+    """Ключ (время, ранг, id) из курсора ленты изменений."""
+    try:
+        raw = base64.urlsafe_b64decode(value.encode()).decode()
+        changed_at, rank, pk = raw.split('|')
+        key = parse_datetime(changed_at), int(rank), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        key = None
+    if key is None or key[0] is None:
+        raise ValidationError({'since': 'Некорректный курсор.'})
+    return key
+
+
+def get_count_cache_key(queryset):
+    """Ключ кэша количества объектов для SQL-запроса."""
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return None
+    digest = hashlib.md5(sql.encode()).hexdigest()
+    return f'{COUNT_CACHE_PREFIX}:{digest}'
+
+
+def get_approximate_count(queryset):
+    """
+    Закэшированное количество объектов выборки.
+
+    Устаревшее значение отдаётся сразу, а пересчёт запускается в фоновом
+    потоке; одновременно пересчитывает только один поток.
+    """
+    if not isinstance(queryset, QuerySet):
+        return len(queryset)
+    key = get_count_cache_key(queryset)
+    if key is None:
+        return 0
+    cached = cache.get(key)
+    if cached is None:
+        return refresh_count(key, queryset)
+    count, fresh_until = cached
+    if fresh_until < time.time() and cache.add(f'{key}:lock', True, 60):
+        threading.Thread(
+            target=refresh_count_in_background,
+            args=(key, queryset.all()),
+            daemon=True,
+        ).start()
+    return count
+
+
+def refresh_count(key, queryset):
+    """Пересчитывает количество и сохраняет его в кэш."""
+    ttl = settings.PAGINATION_COUNT_CACHE_TTL
+    count = queryset.count()
+    cache.set(
+        key, (count, time.time() + ttl),
+        ttl * settings.PAGINATION_COUNT_STALE_FACTOR
+    )
+    return count
+
+
+def refresh_count_in_background(key, queryset):
+    """Фоновый пересчёт количества в отдельном соединении с БД."""
+    try:
+        refresh_count(key, queryset)
+    finally:
+        cache.delete(f'{key}:lock')
+        connections.close_all()
@@ -0,0 +1,51 @@
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSON-рендерер на orjson.
+
+    Вывод совпадает с JSONRenderer побайтно: даты пишутся в формате
+    ISO 8601 с `Z` для UTC, Decimal, ленивые строки и прочие типы
+    приводятся тем же JSONEncoder, что и в DRF. Для форматированного
+    вывода (indent) и без установленного orjson используется json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Сериализация `data` в JSON."""
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context)
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и JSONRenderer, экранируем U+2028 и U+2029.
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -1,4 +1,7 @@
+from collections import Counter
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
@@ -6,9 +9,12 @@ from rest_framework.serializers import ValidationError
 
 from reviews.constants import TITLE_NAME_LENGTH
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.reference import category_cache, genre_cache
 from users.constants import USER_BASE_LENGTH, USER_EMAIL_LENGTH
 from users.validators import validate_username
-from .base_serializers import BaseCommentSerializer
+from .base_serializers import (BaseCommentSerializer, BoundedListSerializer,
+                               ExpandFieldsMixin, SparseFieldsMixin)
+from .fields import CachedSlugRelatedField, SharedRatingField
 
 User = get_user_model()
 
@@ -55,7 +61,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         allow_blank=False,
         max_length=USER_BASE_LENGTH,
@@ -198,50 +204,112 @@ class TokenSerializer(serializers.ModelSerializer):
         return {'user': user}
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class SlugBulkListSerializer(BoundedListSerializer):
+    """Массовое создание жанров или категорий."""
+
+    max_size_setting = 'TAXONOMY_BULK_MAX_SIZE'
+
+    def validate(self, attrs):
+        """Уникальность slug внутри пакета."""
+        counts = Counter(item['slug'] for item in attrs)
+        duplicates = sorted(
+            slug for slug, count in counts.items() if count > 1
+        )
+        if duplicates:
+            raise ValidationError(
+                f'Повторяющиеся slug в запросе: {", ".join(duplicates)}.'
+            )
+        return attrs
+
+    def create(self, validated_data):
+        """Вставка всех объектов одним запросом."""
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            model(**attrs) for attrs in validated_data
+        )
+
+
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор жанров."""
 
     class Meta:
         """Мета-класс для сериализатора жанров."""
-        fields = ('name', 'slug')
+        fields = ('name', 'slug', 'title_count')
+        read_only_fields = ('title_count',)
+        optional_fields = ('title_count',)
         model = Genre
         lookup_field = 'slug'
+        list_serializer_class = SlugBulkListSerializer
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор категорий."""
 
     class Meta:
         """Мета-класс для сериализатора категорий."""
 
-        fields = ('name', 'slug')
+        fields = ('name', 'slug', 'title_count')
+        read_only_fields = ('title_count',)
+        optional_fields = ('title_count',)
         model = Category
         lookup_field = 'slug'
+        list_serializer_class = SlugBulkListSerializer
 
 
-class TitleReadonlySerializer(serializers.ModelSerializer):
+class TitleReadonlySerializer(
+    ExpandFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """Сериализатор произведений для List и Retrieve."""
 
-    rating = serializers.IntegerField(read_only=True, default=0)
+    rating = SharedRatingField(default=0)
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
 
     class Meta:
         """Мета-класс для сериализатора произведений."""
 
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'weighted_rating',
+            'description', 'genre', 'category',
+        )
         model = Title
 
+    def get_expandable_fields(self):
+        """Первая страница отзывов по ?expand=reviews."""
+        return {'reviews': (ReviewSerializer, 'expanded_reviews')}
+
+
+class TitleListSerializer(BoundedListSerializer):
+    """Массовое создание произведений."""
+
+    max_size_setting = 'TITLES_BULK_MAX_SIZE'
+    max_size_message = 'Не больше {max_size} произведений за один запрос.'
+
+    def create(self, validated_data):
+        """Вставка произведений и их жанров в одной транзакции."""
+        items = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            genres = attrs.pop('genre')
+            items.append((Title(**attrs), genres))
+        titles = Title.objects.bulk_create_with_genres(items)
+        prefetched = Title.objects.filter(
+            pk__in=[title.pk for title in titles]
+        ).select_related('category').prefetch_related('genre').in_bulk()
+        return [prefetched[title.pk] for title in titles]
+
 
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор произведений для Create, Partial_Update и Delete."""
 
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
+        reference_cache=category_cache,
         slug_field='slug',
         queryset=Category.objects.all(),
         required=True
     )
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
+        reference_cache=genre_cache,
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True,
@@ -254,8 +322,9 @@ class TitleSerializer(serializers.ModelSerializer):
     class Meta:
         """Мета-класс для сериализатора произведений."""
 
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
+        list_serializer_class = TitleListSerializer
 
     def validate_year(self, value):
         """Валидация года произведения."""
@@ -273,6 +342,23 @@ class TitleSerializer(serializers.ModelSerializer):
             )
         return value
 
+    @transaction.atomic
+    def create(self, validated_data):
+        """Создание произведения с массовой вставкой жанров."""
+        genres = validated_data.pop('genre')
+        title = super().create(validated_data)
+        title.set_genres(genres, created=True)
+        return title
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Обновление произведения с заменой жанров по разнице."""
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            title.set_genres(genres)
+        return title
+
 
 class ReviewSerializer(BaseCommentSerializer):
     """Сериализатор для Отзывов."""
@@ -286,7 +372,17 @@ class ReviewSerializer(BaseCommentSerializer):
         """Мета-класс для сериализатора Отзывов."""
 
         model = Review
-        fields = ('id', 'author', 'text', 'score', 'pub_date')
+        fields = (
+            'id', 'author', 'text', 'score', 'pub_date',
+            'comment_count', 'last_comment_at',
+        )
+        read_only_fields = (
+            'id', 'pub_date', 'comment_count', 'last_comment_at',
+        )
+
+    def get_expandable_fields(self):
+        """Первая страница комментариев по ?expand=comments."""
+        return {'comments': (CommentSerializer, 'expanded_comments')}
 
     def validate(self, data):
         """Проверка уникальности отзыва"""
@@ -314,3 +410,47 @@ class CommentSerializer(BaseCommentSerializer):
         """Мета-класс для сериализатора Комментариев."""
         model = Comment
         fields = ('id', 'author', 'text', 'pub_date')
+
+
+class TitleContextSerializer(serializers.ModelSerializer):
+    """Краткие сведения о произведении для лент пользователя."""
+
+    class Meta:
+        """Мета-класс для кратких сведений о произведении."""
+
+        model = Title
+        fields = ('id', 'name', 'year')
+
+
+class ReviewContextSerializer(serializers.ModelSerializer):
+    """Краткие сведения об отзыве для ленты комментариев пользователя."""
+
+    title = TitleContextSerializer(read_only=True)
+
+    class Meta:
+        """Мета-класс для кратких сведений об отзыве."""
+
+        model = Review
+        fields = ('id', 'title', 'score')
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв пользователя вместе с произведением."""
+
+    title = TitleContextSerializer(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        """Мета-класс для отзывов пользователя."""
+
+        fields = ReviewSerializer.Meta.fields + ('title',)
+
+
+class UserCommentSerializer(CommentSerializer):
+    """Комментарий пользователя вместе с отзывом и произведением."""
+
+    review = ReviewContextSerializer(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        """Мета-класс для комментариев пользователя."""
+
+        fields = CommentSerializer.Meta.fields + ('review',)
@@ -0,0 +1,148 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+LOCK_SUFFIX = 'lock'
+MISSING = object()
+
+
+class Call:
+    """Вычисление, которого ждут одновременные запросы."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вычислений одного ключа в процессе.
+
+    Первый поток выполняет вычисление, остальные ждут его и получают тот
+    же результат или то же исключение.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """Результат `func()`, вычисленный одним потоком на ключ."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+flights = SingleFlight()
+
+
+def lock_key(key):
+    """Ключ блокировки вычисления в общем кэше."""
+    return f'{key}:{LOCK_SUFFIX}'
+
+
+def get_or_compute(key, compute, refresh=None):
+    """
+    Значение из общего кэша с объединением промахов.
+
+    Свежее значение отдаётся сразу. Устаревшее тоже отдаётся сразу, а
+    пересчёт `refresh()` (по умолчанию `compute()`) запускается в фоновом
+    потоке одним процессом — тем, кто взял блокировку в кэше. `refresh`
+    выполняется после ответа и не должен использовать объекты текущего
+    запроса. При промахе вычисляет один поток процесса (SingleFlight) и
+    один процесс среди всех, у кого общий кэш: остальные ждут, пока
+    значение появится в кэше.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if fresh_until < time.time() and cache.add(
+            lock_key(key), True, settings.SINGLEFLIGHT_LOCK_TIMEOUT
+        ):
+            threading.Thread(
+                target=refresh_in_background,
+                args=(key, refresh or compute),
+                daemon=True,
+            ).start()
+        return value
+    return flights.do(key, lambda: fill(key, compute))
+
+
+def fill(key, compute):
+    """Вычисление при промахе под блокировкой в общем кэше."""
+    locked = cache.add(
+        lock_key(key), True, settings.SINGLEFLIGHT_LOCK_TIMEOUT
+    )
+    if not locked:
+        value = wait_for_value(key)
+        if value is not MISSING:
+            return value
+    try:
+        return store(key, compute())
+    finally:
+        if locked:
+            cache.delete(lock_key(key))
+
+
+def wait_for_value(key):
+    """
+    Ожидание значения, которое вычисляет другой процесс.
+
+    Возвращает MISSING, если блокировку сняли без результата (вычисление
+    завершилось ошибкой) или ожидание дольше SINGLEFLIGHT_WAIT_SECONDS.
+    """
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(settings.SINGLEFLIGHT_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if cache.get(lock_key(key)) is None:
+            break
+    return MISSING
+
+
+def store(key, value):
+    """Сохраняет значение: свежим на TTL, в кэше на TTL * STALE_FACTOR."""
+    ttl = settings.RESPONSE_CACHE_TTL
+    cache.set(
+        key, (value, time.time() + ttl),
+        ttl * settings.RESPONSE_CACHE_STALE_FACTOR
+    )
+    return value
+
+
+def refresh_in_background(key, compute):
+    """
+    Фоновый пересчёт устаревшего значения в отдельном соединении с БД.
+
+    Если `compute()` вернул MISSING, в кэше остаётся прежнее значение.
+    """
+    try:
+        value = compute()
+        if value is not MISSING:
+            store(key, value)
+    finally:
+        cache.delete(lock_key(key))
+        connections.close_all()
@@ -1,22 +1,27 @@
 from django.urls import include, path
-from rest_framework import routers
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ProfileViewSet, ReviewViewSet, SignupViewSet, TitleViewSet,
-                    TokenViewSet, UserViewSet)
+from .async_views import AsyncReadRouter
+from .views import (CategoryViewSet, ChangesViewSet, CommentViewSet,
+                    GenreViewSet, ProfileViewSet, ReviewViewSet,
+                    SignupViewSet, TitleViewSet, TokenViewSet,
+                    UserCommentViewSet, UserReviewViewSet, UserViewSet)
 
 app_name = 'api'
-router_v1 = routers.DefaultRouter()
+router_v1 = AsyncReadRouter()
 
-router_v1.register(r'genres', GenreViewSet, basename='genres')
-router_v1.register(r'categories', CategoryViewSet, basename='categories')
-router_v1.register(r'titles', TitleViewSet, basename='titles')
+router_v1.register(r'genres', GenreViewSet, basename='genres',
+                   async_reads=True)
+router_v1.register(r'categories', CategoryViewSet, basename='categories',
+                   async_reads=True)
+router_v1.register(r'titles', TitleViewSet, basename='titles',
+                   async_reads=True)
 router_v1.register(r'titles\/(?P<title_id>\d+)\/reviews',
-                   ReviewViewSet, basename='reviews')
+                   ReviewViewSet, basename='reviews', async_reads=True)
 router_v1.register(r'titles\/(?P<title_id>\d+)\/reviews'
                    r'\/(?P<review_id>\d+)\/comments',
-                   CommentViewSet, basename='comments')
+                   CommentViewSet, basename='comments', async_reads=True)
 router_v1.register(r'users', UserViewSet, basename='users')
+router_v1.register(r'changes', ChangesViewSet, basename='changes')
 
 auth_patterns = [
     path('signup/', SignupViewSet.as_view({'post': 'create'}), name='signup'),
@@ -28,6 +33,12 @@ urlpatterns = [
          ProfileViewSet.as_view({'get': 'retrieve',
                                  'patch': 'partial_update'}),
          name='me'),
+    path('v1/users/me/reviews/',
+         UserReviewViewSet.as_view({'get': 'list'}),
+         name='my-reviews'),
+    path('v1/users/me/comments/',
+         UserCommentViewSet.as_view({'get': 'list'}),
+         name='my-comments'),
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(auth_patterns)),
 ]
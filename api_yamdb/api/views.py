@@ -1,22 +1,35 @@
+from collections import defaultdict
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, viewsets
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title
+from reviews import cache_versions, changes, counters
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, SimilarTitle, Title, TitleScoreHistogram,
+                            Tombstone)
+from reviews.reference import category_cache, genre_cache
+from . import events
 from .filters import TitlesFilter
-from .mixins import (CommentMixin, CreateListDestroyViewset, ProfileMixins,
-                     ReviewMixin, UserMixins)
+from .mixins import (AuthorFeedMixin, CommentMixin, CreateListDestroyViewset,
+                     ExpandMixin, ProfileMixins, ResponseCacheMixin,
+                     ReviewMixin, SparseFieldsViewMixin, UserMixins)
+from .pagination import decode_change_cursor, encode_change_cursor
 from .permissions import Titlepermission
 from .serializers import (CategorySerializer, GenreSerializer,
                           SignUserSerializer, TitleReadonlySerializer,
-                          TitleSerializer, TokenSerializer)
+                          TitleSerializer, TokenSerializer,
+                          UserCommentSerializer, UserReviewSerializer)
 
 User = get_user_model()
 
@@ -69,11 +82,27 @@ class UserViewSet(UserMixins):
     """Вьюсет для работы с пользователями."""
 
 
+class UserReviewViewSet(AuthorFeedMixin):
+    """Вьюсет отзывов текущего пользователя."""
+
+    queryset = Review.objects.select_related('author', 'title')
+    serializer_class = UserReviewSerializer
+
+
+class UserCommentViewSet(AuthorFeedMixin):
+    """Вьюсет комментариев текущего пользователя."""
+
+    queryset = Comment.objects.select_related('author', 'review__title')
+    serializer_class = UserCommentSerializer
+
+
 class GenreViewSet(CreateListDestroyViewset):
     """Вью для жанров."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    reference_cache = genre_cache
+    leaderboard_scope = LeaderboardEntry.GENRE
 
 
 class CategoryViewSet(CreateListDestroyViewset):
@@ -81,28 +110,200 @@ class CategoryViewSet(CreateListDestroyViewset):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    reference_cache = category_cache
+    leaderboard_scope = LeaderboardEntry.CATEGORY
+
+    def perform_bulk_destroy(self, queryset):
+        """Обнуление категории у произведений одним UPDATE перед удалением."""
+        Title.objects.filter(category__in=queryset).update(
+            category=None, updated_at=timezone.now()
+        )
+        super().perform_bulk_destroy(queryset)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ResponseCacheMixin, ExpandMixin, SparseFieldsViewMixin,
+    viewsets.ModelViewSet
+):
     """Вью для произведений."""
 
-    queryset = (
-        Title.objects.all().annotate(
-            rating=Avg('reviews__score')
-        ).order_by('name')
-    )
+    queryset = Title.objects.all().order_by('name')
     serializer_class = TitleSerializer
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitlesFilter
+    ordering_fields = ('name', 'year', 'weighted_rating')
     permission_classes = [Titlepermission]
     http_method_names = ('get', 'patch', 'post', 'delete')
+    sparse_fields_only = {
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'weighted_rating': ('weighted_rating',),
+        'category': ('category__name', 'category__slug'),
+    }
+    sparse_fields_select = {'category': ('category',)}
+    sparse_fields_prefetch = {'genre': ('genre',)}
+    sparse_fields_annotate = {'rating': {'rating': counters.title_rating()}}
+    sparse_fields_actions = ('list', 'retrieve', 'batch')
+    expand_actions = ('retrieve',)
+    expand_prefetches = {
+        'reviews': {
+            'lookup': 'reviews',
+            'queryset': Review.objects.select_related('author'),
+            'parent_field': 'title_id',
+            'to_attr': 'expanded_reviews',
+        },
+        'reviews.comments': {
+            'lookup': 'expanded_reviews__comments',
+            'queryset': Comment.objects.select_related('author'),
+            'parent_field': 'review_id',
+            'to_attr': 'expanded_comments',
+        },
+    }
+
+    response_cache_versions = {
+        'list': lambda view: (cache_versions.TITLE_LISTS,),
+        'retrieve': lambda view: view.get_detail_cache_versions(),
+    }
+    # Развёрнутые отзывы и комментарии меняются без смены версий.
+    response_cache_skip_params = ('expand',)
+
+    def list(self, request, *args, **kwargs):
+        """Список произведений из кэша ответов."""
+        compute = super().list
+        return self.cached_response(
+            lambda: compute(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Произведение из кэша ответов."""
+        compute = super().retrieve
+        return self.cached_response(
+            lambda: compute(request, *args, **kwargs)
+        )
+
+    def get_detail_cache_versions(self):
+        """Версии кэша карточки; id не в каноническом виде не кэшируется."""
+        pk = self.kwargs['pk']
+        if not pk.isdigit() or str(int(pk)) != pk:
+            return None
+        return (
+            cache_versions.TITLE_DETAILS, cache_versions.title_detail(pk)
+        )
 
     def get_serializer_class(self):
         """Получение произведений."""
-        if self.action in ('retrieve', 'list'):
+        if self.action in ('retrieve', 'list', 'batch'):
             return TitleReadonlySerializer
         return TitleSerializer
 
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk_create(self, request):
+        """
+        Массовое создание произведений из списка.
+
+        Все элементы проверяются за один проход, при ошибках возвращается
+        список ошибок по позициям элементов и ничего не создаётся.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=('get',), url_path='batch')
+    def batch(self, request):
+        """
+        Произведения по списку id из параметра ?ids=1,2,3 одним запросом.
+
+        Порядок результатов совпадает с порядком id в запросе, id
+        несуществующих произведений перечисляются в `missing`.
+        """
+        ids = self.get_batch_ids()
+        titles = self.narrow_queryset(
+            self.get_queryset().filter(pk__in=ids)
+        ).in_bulk()
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids if pk in titles], many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in titles],
+        })
+
+    @action(detail=True, methods=('get',))
+    def histogram(self, request, pk=None):
+        """
+        Распределение оценок произведения.
+
+        Отдаётся из предрассчитанной таблицы одним запросом по первичному
+        ключу; произведение без оценок получает нулевое распределение.
+        """
+        pk = self.get_title_id()
+        fields = TitleScoreHistogram.score_fields()
+        row = TitleScoreHistogram.objects.filter(title_id=pk).values_list(
+            *(name for _, name in fields)
+        ).first()
+        if row is None:
+            get_object_or_404(Title.objects.only('pk'), pk=pk)
+            row = (0,) * len(fields)
+        return Response({
+            'histogram': {
+                str(score): count
+                for (score, _), count in zip(fields, row)
+            },
+            'count': sum(row),
+        })
+
+    @action(detail=True, methods=('get',))
+    def similar(self, request, pk=None):
+        """
+        Похожие произведения из предрассчитанного списка соседей.
+
+        Список читается одним запросом по индексу (title, position);
+        для новых произведений он появляется после build_similar_titles.
+        """
+        pk = self.get_title_id()
+        rows = SimilarTitle.objects.filter(title_id=pk).order_by(
+            'position'
+        ).values_list(
+            'similar_id', 'similar__name', 'similar__year', 'score'
+        )
+        if not rows:
+            get_object_or_404(Title.objects.only('pk'), pk=pk)
+        return Response({'results': [
+            {'id': title_id, 'name': name, 'year': year, 'score': score}
+            for title_id, name, year, score in rows
+        ]})
+
+    def get_title_id(self):
+        """
+        Id произведения из URL без запроса к БД.
+
+        Нечисловой id даёт 404, как в retrieve, а не ошибку фильтрации.
+        """
+        try:
+            return int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise NotFound
+
+    def get_batch_ids(self):
+        """Список id без повторов в порядке запроса."""
+        raw_ids = self.request.query_params.get('ids', '')
+        try:
+            ids = list(dict.fromkeys(
+                int(pk) for pk in raw_ids.split(',') if pk.strip()
+            ))
+        except ValueError:
+            raise ValidationError({'ids': 'id должны быть целыми числами.'})
+        if not ids:
+            raise ValidationError({'ids': 'Не передан список id.'})
+        if len(ids) > settings.TITLES_BATCH_MAX_SIZE:
+            raise ValidationError({
+                'ids': f'Не больше {settings.TITLES_BATCH_MAX_SIZE} id '
+                       'за один запрос.'
+            })
+        return ids
+
 
 class ReviewViewSet(ReviewMixin):
     """Вью для отзывов."""
@@ -118,9 +319,15 @@ class ReviewViewSet(ReviewMixin):
         """Получить отзывы к произведению."""
         return self.get_title().reviews.all()
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        """Сохранить отзыв."""
-        serializer.save(author=self.request.user, title=self.get_title())
+        """Сохранить отзыв и опубликовать событие произведения."""
+        review = serializer.save(
+            author=self.request.user, title=self.get_title()
+        )
+        events.publish_on_commit(
+            review.title_id, events.REVIEW_CREATED, serializer.data
+        )
 
 
 class CommentViewSet(CommentMixin):
@@ -138,6 +345,124 @@ class CommentViewSet(CommentMixin):
         """Получить комментарии к отзыву."""
         return self.get_review().comments.all()
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        """Сохранить отзыв."""
-        serializer.save(author=self.request.user, review=self.get_review())
+        """Сохранить комментарий и опубликовать событие произведения."""
+        comment = serializer.save(
+            author=self.request.user, review=self.get_review()
+        )
+        events.publish_on_commit(
+            comment.review.title_id, events.COMMENT_CREATED,
+            {**serializer.data, 'review': comment.review_id},
+        )
+
+
+class ChangesViewSet(viewsets.ViewSet):
+    """
+    Лента изменений произведений, отзывов и комментариев.
+
+    GET /api/v1/changes/?since=<курсор> отдаёт изменения после курсора по
+    порядку: `upsert` с актуальным представлением объекта или `delete`.
+    Клиент сохраняет `cursor` из ответа и запрашивает следующую порцию,
+    пока `has_more` истинно; без `since` лента отдаётся с начала.
+
+    Продолжить можно с курсора не старше CHANGES_TOMBSTONE_RETENTION_DAYS:
+    более старые отметки об удалении удаляются, и на такой курсор
+    возвращается 400 — клиенту нужна полная синхронизация без `since`.
+    Пустая порция продвигает курсор до границы отдаваемых изменений, так
+    что курсор клиента, регулярно опрашивающего ленту, не устаревает.
+    """
+
+    change_sources = {
+        Tombstone.TITLE: (
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ).annotate(rating=counters.title_rating()),
+            TitleReadonlySerializer,
+        ),
+        Tombstone.REVIEW: (
+            Review.objects.select_related('author', 'title'),
+            UserReviewSerializer,
+        ),
+        Tombstone.COMMENT: (
+            Comment.objects.select_related('author', 'review__title'),
+            UserCommentSerializer,
+        ),
+    }
+
+    def list(self, request):
+        """Следующая порция изменений после курсора."""
+        since = request.query_params.get('since')
+        cursor = decode_change_cursor(since) if since else None
+        if cursor is not None and changes.cursor_expired(cursor):
+            raise ValidationError({'since': (
+                'Курсор старше срока хранения отметок об удалении '
+                f'({settings.CHANGES_TOMBSTONE_RETENTION_DAYS} дн.), нужна '
+                'полная синхронизация без since.'
+            )})
+        keys, has_more, next_cursor = changes.next_changes(
+            cursor, self.get_limit()
+        )
+        upserts = self.get_upserts(keys)
+        tombstones = Tombstone.objects.in_bulk(
+            [pk for _, rank, pk in keys if changes.SOURCES[rank][2] is None]
+        )
+        items = []
+        for _, rank, pk in keys:
+            kind = changes.SOURCES[rank][2]
+            if kind is None:
+                tombstone = tombstones.get(pk)
+                if tombstone is not None:
+                    items.append({
+                        'type': tombstone.kind,
+                        'op': changes.DELETE,
+                        'id': tombstone.object_id,
+                    })
+            elif (kind, pk) in upserts:
+                # Объект, удалённый после выборки ключей, пропускается:
+                # его отметка об удалении придёт следующей порцией.
+                items.append({
+                    'type': kind,
+                    'op': changes.UPSERT,
+                    'id': pk,
+                    'data': upserts[kind, pk],
+                })
+        return Response({
+            'changes': items,
+            'cursor': encode_change_cursor(next_cursor),
+            'has_more': has_more,
+        })
+
+    def get_upserts(self, keys):
+        """Представления изменённых объектов по одному запросу на тип."""
+        pks = defaultdict(list)
+        for _, rank, pk in keys:
+            kind = changes.SOURCES[rank][2]
+            if kind is not None:
+                pks[kind].append(pk)
+        upserts = {}
+        for kind, kind_pks in pks.items():
+            queryset, serializer_class = self.change_sources[kind]
+            serializer = serializer_class(
+                queryset.filter(pk__in=kind_pks),
+                many=True,
+                context={'request': self.request, 'view': self},
+            )
+            for item in serializer.data:
+                upserts[kind, item['id']] = item
+        return upserts
+
+    def get_limit(self):
+        """Размер порции из ?limit=."""
+        limit = self.request.query_params.get('limit')
+        if limit is None:
+            return settings.CHANGES_PAGE_SIZE
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        if not 1 <= limit <= settings.CHANGES_MAX_PAGE_SIZE:
+            raise ValidationError({
+                'limit': f'Допустимо от 1 до {settings.CHANGES_MAX_PAGE_SIZE}.'
+            })
+        return limit
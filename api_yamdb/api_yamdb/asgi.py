@@ -1,7 +1,16 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+# То же, что django.core.asgi.get_asgi_application(), но с обработчиком,
+# выполняющим чтение в пуле потоков.
+django.setup(set_prefix=False)
+
+from api.async_views import AsyncReadASGIHandler  # noqa: E402
+from api.events import events_router  # noqa: E402
+
+django_application = AsyncReadASGIHandler()
+
+application = events_router(django_application)
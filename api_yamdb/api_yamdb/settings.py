@@ -31,14 +31,19 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'api.middleware.SessionSkipAPIMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.CsrfViewSkipAPIMiddleware',
+    'api.middleware.AuthenticationSkipAPIMiddleware',
+    'api.middleware.MessageSkipAPIMiddleware',
+    'api.middleware.XFrameOptionsSkipAPIMiddleware',
 ]
 
+# Запросы с этим префиксом обходят middleware сессий, CSRF, сообщений и
+# clickjacking: API аутентифицируется только через JWT.
+API_PATH_PREFIX = '/api/'
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -59,6 +64,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
+ASGI_APPLICATION = 'api_yamdb.asgi.application'
 
 
 # Database
@@ -71,6 +77,17 @@ DATABASES = {
 }
 
 
+# Cache
+# В продакшене нужен общий для процессов бэкенд (memcached, redis): через
+# него процессы узнают о смене версий справочников (reviews.reference).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,10 +129,104 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OptionalCountPagination',
     'PAGE_SIZE': 5,
 }
 
+# Приближённый подсчёт количества объектов при пагинации (?count=approx):
+# значение считается свежим TTL секунд, устаревшее хранится в кэше
+# TTL * STALE_FACTOR секунд и пересчитывается в фоне.
+PAGINATION_COUNT_CACHE_TTL = 60
+PAGINATION_COUNT_STALE_FACTOR = 10
+
+# Максимальное число произведений в POST /api/v1/titles/bulk/.
+TITLES_BULK_MAX_SIZE = 1000
+# Максимальное число id в GET /api/v1/titles/batch/?ids=.
+TITLES_BATCH_MAX_SIZE = 100
+# Максимальное число жанров или категорий в POST .../bulk/.
+TAXONOMY_BULK_MAX_SIZE = 1000
+
+# Взвешенный (байесовский) рейтинг произведений, который пересчитывает
+# команда update_weighted_ratings: априорное среднее берётся по категории
+# ('category') или по всему каталогу ('global') с весом PRIOR_WEIGHT оценок.
+WEIGHTED_RATING_PRIOR = 'category'
+WEIGHTED_RATING_PRIOR_WEIGHT = 10
+
+# Число произведений в топах категорий и жанров (reviews.leaderboards).
+LEADERBOARD_SIZE = 100
+
+# Похожие произведения (команда build_similar_titles): число соседей и веса
+# сходства по жанрам и по общим авторам отзывов.
+SIMILAR_TITLES_COUNT = 10
+SIMILAR_TITLES_GENRE_WEIGHT = 1.0
+SIMILAR_TITLES_REVIEW_WEIGHT = 1.0
+
+# Лента изменений /api/v1/changes/: размер порции по умолчанию и предельный,
+# и сколько секунд придерживаются свежие изменения, чтобы изменения из ещё
+# не зафиксированных транзакций не оказались позади выданного курсора.
+# SETTLE_SECONDS должен быть больше самой долгой пишущей транзакции:
+# изменения транзакции дольше этого срока клиент может пропустить.
+# Отметки об удалении старше TOMBSTONE_RETENTION_DAYS удаляет команда
+# prune_tombstones; курсор старше этого срока не принимается, и клиенту
+# нужна полная синхронизация.
+CHANGES_PAGE_SIZE = 100
+CHANGES_MAX_PAGE_SIZE = 1000
+CHANGES_SETTLE_SECONDS = 2
+CHANGES_TOMBSTONE_RETENTION_DAYS = 30
+
+# События новых отзывов и комментариев (GET /api/v1/titles/<id>/events/,
+# только под ASGI). Брокер по умолчанию работает в памяти процесса; для
+# нескольких процессов — 'api.events.RedisBroker' с EVENTS_REDIS_URL.
+# Очередь медленного клиента хранит не больше QUEUE_SIZE событий.
+EVENTS_BROKER = os.getenv('EVENTS_BROKER', 'api.events.LocalBroker')
+EVENTS_REDIS_URL = os.getenv('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+EVENTS_QUEUE_SIZE = 100
+EVENTS_KEEPALIVE_SECONDS = 15
+EVENTS_RETRY_MILLISECONDS = 3000
+
+# Чтение произведений, отзывов, комментариев, жанров и категорий под ASGI
+# выполняется параллельно в пуле потоков (api.async_views); False
+# возвращает выполнение по одному в общем потоке, как у синхронных вью.
+# Под WSGI вью всегда вызываются напрямую.
+ASYNC_READ_VIEWS = True
+
+# Кэш ответов списка и карточек произведений и топов (api.singleflight):
+# ответ свежий TTL секунд и хранится TTL * STALE_FACTOR секунд, устаревший
+# отдаётся, пока один процесс пересчитывает его в фоне. При промахе
+# вычисляет один запрос, остальные ждут до WAIT_SECONDS, опрашивая кэш.
+# Для объединения между процессами нужен общий кэш (Redis, Memcached).
+RESPONSE_CACHE_TTL = 30
+RESPONSE_CACHE_STALE_FACTOR = 10
+SINGLEFLIGHT_LOCK_TIMEOUT = 30
+SINGLEFLIGHT_WAIT_SECONDS = 5
+SINGLEFLIGHT_POLL_SECONDS = 0.05
+
+# Общая для процессов таблица рейтингов в отображённом в память файле
+# (reviews.rating_table), например /dev/shm/yamdb-ratings. Без пути
+# выключена, и рейтинг берётся из запроса к БД. CAPACITY — начальное число
+# записей; файл растёт сам. Заполняется командой rebuild_rating_table.
+RATING_TABLE_PATH = os.getenv('RATING_TABLE_PATH')
+RATING_TABLE_CAPACITY = 65536
+
+# Сжатие ответов (api.middleware.CompressionMiddleware). Brotli используется,
+# если установлен пакет brotli. Ответы длиннее COMPRESSION_FAST_LENGTH байт
+# сжимаются самым быстрым уровнем, а ответы длиннее COMPRESSION_MAX_LENGTH
+# отдаются без сжатия: это предел затрат CPU на сжатие одного ответа.
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_FAST_LENGTH = 1024 * 1024
+COMPRESSION_MAX_LENGTH = 8 * 1024 * 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -17,10 +17,21 @@ class BaseComment(models.Model):
         'Текст',
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True,
+    )
 
     class Meta:
         abstract = True
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='%(class)s_author_pub_date'
+            )
+        ]
 
     def __str__(self):
         return self.text
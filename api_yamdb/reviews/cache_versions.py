@@ -0,0 +1,72 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_PREFIX = 'cache-version'
+# Списки произведений, все карточки произведений и все топы.
+TITLE_LISTS = 'title-lists'
+TITLE_DETAILS = 'title-details'
+LEADERBOARDS = 'leaderboards'
+
+
+def title_detail(pk):
+    """Версия карточки одного произведения."""
+    return f'title:{pk}'
+
+
+def version_key(name):
+    """Ключ версии в общем кэше."""
+    return f'{VERSION_PREFIX}:{name}'
+
+
+def new_version():
+    """
+    Начальная версия: время в наносекундах.
+
+    Если версия вытеснена из кэша, новая не совпадёт ни с одной прежней,
+    и закэшированные по старым версиям данные не оживут.
+    """
+    return time.time_ns()
+
+
+def get_versions(*names):
+    """Текущие версии из общего кэша одним запросом."""
+    keys = [version_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, new_version(), None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def bump(*names):
+    """Меняет версии во всех процессах, делая кэш по ним недоступным."""
+    for name in names:
+        key = version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), None)
+
+
+def title_changed(pk):
+    """
+    Сброс кэша произведения после фиксации транзакции.
+
+    До фиксации другой запрос мог бы заново закэшировать ещё старые
+    данные под новой версией.
+    """
+    transaction.on_commit(
+        lambda: bump(TITLE_LISTS, title_detail(pk), LEADERBOARDS)
+    )
+
+
+def catalog_changed():
+    """Сброс кэша всех произведений и топов после фиксации транзакции."""
+    transaction.on_commit(
+        lambda: bump(TITLE_LISTS, TITLE_DETAILS, LEADERBOARDS)
+    )
@@ -0,0 +1,123 @@
+import heapq
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Comment, Review, Title, Tombstone
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+# Источники ленты изменений в порядке их ранга в курсоре:
+# (модель, поле времени изменения, тип объекта или None для отметок).
+SOURCES = (
+    (Title, 'updated_at', Tombstone.TITLE),
+    (Review, 'updated_at', Tombstone.REVIEW),
+    (Comment, 'updated_at', Tombstone.COMMENT),
+    (Tombstone, 'deleted_at', None),
+)
+
+
+def after_cursor(rank, time_field, cursor):
+    """
+    Условие на строки источника `rank`, идущие в ленте после курсора.
+
+    Курсор — ключ последнего отданного изменения (время, ранг, id):
+    строки с тем же временем упорядочены по рангу источника и id.
+    """
+    if cursor is None:
+        return Q()
+    changed_at, cursor_rank, cursor_pk = cursor
+    if rank < cursor_rank:
+        return Q(**{f'{time_field}__gt': changed_at})
+    if rank > cursor_rank:
+        return Q(**{f'{time_field}__gte': changed_at})
+    return Q(**{f'{time_field}__gt': changed_at}) | Q(**{
+        time_field: changed_at, 'pk__gt': cursor_pk
+    })
+
+
+def settled_before():
+    """
+    Граница времени изменений, которые уже можно отдавать.
+
+    Время изменения ставится до фиксации транзакции, поэтому изменения
+    моложе CHANGES_SETTLE_SECONDS придерживаются: иначе медленная
+    транзакция могла бы зафиксировать строку с временем раньше уже
+    отданного курсора, и клиент бы её пропустил. Это оценка, а не
+    гарантия: изменения транзакции, которая длится дольше этого срока
+    (например, массовой загрузки), всё равно могут оказаться позади
+    курсора, поэтому срок должен быть больше самой долгой транзакции.
+    """
+    return timezone.now() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+
+
+def retention_horizon():
+    """
+    Самое раннее время курсора, с которого можно продолжить ленту.
+
+    Отметки об удалении старше CHANGES_TOMBSTONE_RETENTION_DAYS удаляются
+    командой prune_tombstones, так что клиент с более старым курсором мог
+    бы пропустить удаления.
+    """
+    return timezone.now() - timedelta(
+        days=settings.CHANGES_TOMBSTONE_RETENTION_DAYS
+    )
+
+
+def cursor_expired(cursor):
+    """Курсор старше срока хранения отметок об удалении."""
+    return cursor[0] < retention_horizon()
+
+
+def prune_tombstones(before=None):
+    """
+    Удаление отметок об удалении старше `before` одним DELETE.
+
+    По умолчанию — старше срока хранения. Возвращает число удалённых.
+    """
+    if before is None:
+        before = retention_horizon()
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=before).delete()
+    return deleted
+
+
+def source_keys(rank, cursor, until, limit):
+    """Ключи следующих `limit` изменений одного источника по индексу."""
+    model, time_field, _ = SOURCES[rank]
+    rows = model.objects.filter(
+        after_cursor(rank, time_field, cursor),
+        **{f'{time_field}__lte': until}
+    ).order_by(time_field, 'pk').values_list(time_field, 'pk')[:limit]
+    return [(changed_at, rank, pk) for changed_at, pk in rows]
+
+
+def next_changes(cursor=None, limit=100):
+    """
+    Ключи следующих изменений после курсора, признак продолжения и ключ,
+    с которого продолжить ленту.
+
+    Каждый источник отдаёт не больше limit + 1 ключей сканированием
+    своего индекса по времени изменения, ключи сливаются по порядку,
+    так что стоимость страницы зависит от её размера, а не от размера
+    каталога. Если изменений нет, лента продолжается с границы
+    settled_before(): все изменения до неё уже отданы, и курсор клиента,
+    который давно не пропускал изменений, не устаревает.
+    """
+    until = settled_before()
+    keys = list(heapq.merge(*(
+        source_keys(rank, cursor, until, limit + 1)
+        for rank in range(len(SOURCES))
+    )))
+    page = keys[:limit]
+    if page:
+        next_cursor = page[-1]
+    else:
+        # Ранг после всех источников: следующая страница начнётся
+        # со строк позже until.
+        next_cursor = (until, len(SOURCES), 0)
+        if cursor is not None:
+            next_cursor = max(next_cursor, cursor)
+    return page, len(keys) > limit, next_cursor
@@ -0,0 +1,261 @@
+from django.db import IntegrityError, transaction
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Q, Subquery, Sum, Value)
+from django.db.models.functions import Coalesce, Greatest, NullIf
+from django.utils import timezone
+
+from . import cache_versions, rating_table
+from .models import (Category, Comment, Genre, Review, Title,
+                     TitleScoreHistogram)
+
+
+def aggregate_subquery(queryset, group_field, aggregate):
+    """Подзапрос агрегата по строкам `queryset` для каждой группы."""
+    return Coalesce(Subquery(
+        queryset.order_by()
+        .values(group_field)
+        .annotate(total=aggregate)
+        .values('total')
+    ), 0)
+
+
+def count_subquery(queryset, group_field):
+    """Подзапрос числа строк `queryset` для каждого значения группы."""
+    return aggregate_subquery(queryset, group_field, Count('pk'))
+
+
+def latest_comment_date():
+    """Подзапрос даты последнего комментария к отзыву."""
+    return Subquery(
+        Comment.objects.filter(review_id=OuterRef('pk'))
+        .order_by('-pub_date')
+        .values('pub_date')[:1]
+    )
+
+
+def title_rating():
+    """Средняя оценка произведения из счётчиков, без JOIN с отзывами."""
+    return ExpressionWrapper(
+        F('score_sum') * 1.0 / NullIf(F('score_count'), 0),
+        output_field=FloatField(),
+    )
+
+
+def title_score_counters():
+    """Сумма и число оценок произведения."""
+    reviews = Review.objects.filter(title_id=OuterRef('pk'))
+    return {
+        'score_sum': aggregate_subquery(reviews, 'title_id', Sum('score')),
+        'score_count': count_subquery(reviews, 'title_id'),
+    }
+
+
+def review_comment_counters():
+    """Число комментариев и дата последнего комментария отзыва."""
+    return {
+        'comment_count': count_subquery(
+            Comment.objects.filter(review_id=OuterRef('pk')), 'review_id'
+        ),
+        'last_comment_at': latest_comment_date(),
+    }
+
+
+def category_title_counters():
+    """Число произведений категории."""
+    return {'title_count': count_subquery(
+        Title.objects.filter(category_id=OuterRef('pk')), 'category_id'
+    )}
+
+
+def genre_title_counters():
+    """Число произведений жанра."""
+    return {'title_count': count_subquery(
+        Title.genre.through.objects.filter(genre_id=OuterRef('pk')),
+        'genre_id'
+    )}
+
+
+# Имя группы счётчиков -> (модель, выражения для пересчёта полей).
+COUNTERS = {
+    'titles': (Title, title_score_counters),
+    'reviews': (Review, review_comment_counters),
+    'categories': (Category, category_title_counters),
+    'genres': (Genre, genre_title_counters),
+}
+
+
+def recount(name, queryset=None):
+    """
+    Пересчёт группы счётчиков одним UPDATE.
+
+    Исправляет расхождения после загрузки данных или каскадных удалений,
+    которые не проходят через вьюсеты. Возвращает число обновлённых строк.
+    """
+    model, counters = COUNTERS[name]
+    if queryset is None:
+        queryset = model.objects.all()
+    changes = counters()
+    if has_updated_at(model):
+        changes['updated_at'] = timezone.now()
+    updated = queryset.update(**changes)
+    if model is Title:
+        rating_table.refresh_titles(queryset)
+    cache_versions.catalog_changed()
+    return updated
+
+
+def has_updated_at(model):
+    """Модель отслеживает дату изменения для ленты изменений."""
+    return any(
+        field.name == 'updated_at' for field in model._meta.concrete_fields
+    )
+
+
+def find_drift(name, queryset):
+    """Id объектов выборки, у которых счётчики расходятся с данными."""
+    model, counters = COUNTERS[name]
+    expressions = counters()
+    matches = Q()
+    for field_name in expressions:
+        expected = f'expected_{field_name}'
+        match = Q(**{field_name: F(expected)})
+        if model._meta.get_field(field_name).null:
+            match |= Q(**{
+                f'{field_name}__isnull': True, f'{expected}__isnull': True
+            })
+        matches &= match
+    return list(
+        queryset.annotate(**{
+            f'expected_{field_name}': expression
+            for field_name, expression in expressions.items()
+        }).exclude(matches).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def score_counts():
+    """Агрегаты числа отзывов с каждой оценкой."""
+    return {
+        name: Count('pk', filter=Q(score=score))
+        for score, name in TitleScoreHistogram.score_fields()
+    }
+
+
+def rebuild_histograms(title_ids=None, batch_size=1000):
+    """
+    Пересборка распределений оценок одним агрегирующим запросом к отзывам.
+
+    Без `title_ids` пересобираются распределения всех произведений.
+    Возвращает число произведений с оценками.
+    """
+    reviews = Review.objects.order_by()
+    histograms = TitleScoreHistogram.objects.all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+        histograms = histograms.filter(title_id__in=title_ids)
+    rows = reviews.values('title_id').annotate(**score_counts())
+    with transaction.atomic():
+        histograms.delete()
+        created = TitleScoreHistogram.objects.bulk_create(
+            (TitleScoreHistogram(**row) for row in rows.iterator()),
+            batch_size=batch_size,
+        )
+    return len(created)
+
+
+def change_histogram(title_id, deltas):
+    """
+    Изменяет счётчики оценок произведения одним UPDATE.
+
+    `deltas` — словарь оценка -> приращение. Если распределения ещё нет,
+    оно собирается из отзывов произведения. Если строку тем временем
+    вставил параллельный первый отзыв, приращение применяется к ней:
+    его подсчёт не видел незафиксированного отзыва этой транзакции.
+    """
+    changes = {
+        TitleScoreHistogram.field_name(score): Greatest(
+            F(TitleScoreHistogram.field_name(score)) + delta, Value(0)
+        )
+        for score, delta in deltas.items() if delta
+    }
+    if not changes:
+        return
+    histogram = TitleScoreHistogram.objects.filter(title_id=title_id)
+    if histogram.update(**changes):
+        return
+    counts = Review.objects.filter(
+        title_id=title_id
+    ).order_by().aggregate(**score_counts())
+    if not any(counts.values()):
+        # Отзывов нет, например при каскадном удалении произведения.
+        return
+    try:
+        with transaction.atomic():
+            TitleScoreHistogram.objects.create(title_id=title_id, **counts)
+    except IntegrityError:
+        histogram.update(**changes)
+
+
+def review_added(review):
+    """Учитывает новый отзыв в счётчиках произведения."""
+    Title.objects.filter(pk=review.title_id).update(
+        score_sum=F('score_sum') + review.score,
+        score_count=F('score_count') + 1,
+        updated_at=timezone.now(),
+    )
+    change_histogram(review.title_id, {review.score: 1})
+
+
+def review_score_changed(review, previous_score):
+    """Учитывает изменение оценки отзыва в счётчиках произведения."""
+    if review.score == previous_score:
+        return
+    Title.objects.filter(pk=review.title_id).update(
+        score_sum=Greatest(
+            F('score_sum') + (review.score - previous_score), Value(0)
+        ),
+        updated_at=timezone.now(),
+    )
+    change_histogram(
+        review.title_id, {previous_score: -1, review.score: 1}
+    )
+
+
+def review_removed(review):
+    """Учитывает удаление отзыва в счётчиках произведения."""
+    Title.objects.filter(pk=review.title_id, score_count__gt=0).update(
+        score_sum=Greatest(F('score_sum') - review.score, Value(0)),
+        score_count=F('score_count') - 1,
+        updated_at=timezone.now(),
+    )
+    change_histogram(review.title_id, {review.score: -1})
+
+
+def comment_added(comment):
+    """Учитывает новый комментарий в счётчиках отзыва одним UPDATE."""
+    Review.objects.filter(pk=comment.review_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=Greatest(
+            Coalesce('last_comment_at', Value(comment.pub_date)),
+            Value(comment.pub_date),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def comment_removed(review_id):
+    """Учитывает удаление комментария в счётчиках отзыва одним UPDATE."""
+    Review.objects.filter(pk=review_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        last_comment_at=latest_comment_date(),
+        updated_at=timezone.now(),
+    )
+
+
+def change_title_count(model, pks, delta):
+    """Изменяет число произведений у категорий или жанров одним UPDATE."""
+    pks = [pk for pk in pks if pk is not None]
+    if not pks or not delta:
+        return
+    model.objects.filter(pk__in=pks).update(
+        title_count=Greatest(F('title_count') + delta, Value(0))
+    )
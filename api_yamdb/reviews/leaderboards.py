@@ -0,0 +1,191 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from . import cache_versions
+from .counters import title_rating
+from .models import Category, Genre, LeaderboardEntry, Title
+
+# Тип топа -> фильтр произведений, входящих в топ.
+SCOPE_FILTERS = {
+    LeaderboardEntry.CATEGORY: 'category_id',
+    LeaderboardEntry.GENRE: 'genre',
+}
+
+
+def board(scope):
+    """Записи топа `scope` — пары (тип, id)."""
+    scope_type, scope_id = scope
+    return LeaderboardEntry.objects.filter(
+        scope_type=scope_type, scope_id=scope_id
+    )
+
+
+def rank_key(rating, title_id):
+    """Ключ сравнения мест: выше рейтинг, при равенстве меньше id."""
+    return rating, -title_id
+
+
+def rebuild_scope(scope):
+    """Пересборка топа одним запросом к произведениям категории/жанра."""
+    scope_type, scope_id = scope
+    rows = Title.objects.filter(
+        score_count__gt=0, **{SCOPE_FILTERS[scope_type]: scope_id}
+    ).annotate(rating=title_rating()).order_by('-rating', 'pk').values_list(
+        'pk', 'rating'
+    )[:settings.LEADERBOARD_SIZE]
+    with transaction.atomic():
+        board(scope).delete()
+        LeaderboardEntry.objects.bulk_create(
+            LeaderboardEntry(
+                scope_type=scope_type,
+                scope_id=scope_id,
+                title_id=title_id,
+                rating=rating,
+            )
+            for title_id, rating in rows
+        )
+
+
+def rebuild_all():
+    """Полная пересборка топов всех категорий и жанров."""
+    scopes = [
+        (LeaderboardEntry.CATEGORY, pk)
+        for pk in Category.objects.values_list('pk', flat=True)
+    ] + [
+        (LeaderboardEntry.GENRE, pk)
+        for pk in Genre.objects.values_list('pk', flat=True)
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        for scope in scopes:
+            rebuild_scope(scope)
+        cache_versions.catalog_changed()
+    return len(scopes)
+
+
+def title_scopes(title_id, category_id):
+    """Топы, в которые может входить произведение."""
+    scopes = [
+        (LeaderboardEntry.GENRE, genre_id)
+        for genre_id in Title.genre.through.objects.filter(
+            title_id=title_id
+        ).values_list('genre_id', flat=True)
+    ]
+    if category_id is not None:
+        scopes.append((LeaderboardEntry.CATEGORY, category_id))
+    return scopes
+
+
+def scope_stats(scopes):
+    """Размер и минимальный рейтинг каждого топа одним запросом."""
+    if not scopes:
+        return {}
+    condition = Q()
+    for scope_type, scope_id in scopes:
+        condition |= Q(scope_type=scope_type, scope_id=scope_id)
+    return {
+        (row['scope_type'], row['scope_id']): (row['size'], row['lowest'])
+        for row in LeaderboardEntry.objects.filter(condition).order_by()
+        .values('scope_type', 'scope_id')
+        .annotate(size=Count('pk'), lowest=Min('rating'))
+    }
+
+
+def refresh_title(title_id):
+    """
+    Инкрементальное обновление топов после изменения произведения.
+
+    Произведение убирается из топов, к которым больше не относится или
+    где у него не осталось оценок, и вставляется или обновляется в своих
+    топах с вытеснением последнего места. Если освободилось место или
+    участник опустился ниже остальных в заполненном топе, за его пределами
+    может найтись произведение лучше, и такой топ пересобирается целиком.
+    """
+    title = Title.objects.filter(pk=title_id).values(
+        'category_id', 'score_sum', 'score_count'
+    ).first()
+    scopes, rating = [], None
+    if title is not None:
+        scopes = title_scopes(title_id, title['category_id'])
+        if title['score_count']:
+            rating = title['score_sum'] / title['score_count']
+    entries = {
+        (entry.scope_type, entry.scope_id): entry
+        for entry in LeaderboardEntry.objects.filter(title_id=title_id)
+    }
+    stale = [
+        scope for scope in entries
+        if rating is None or scope not in scopes
+    ]
+    if stale:
+        LeaderboardEntry.objects.filter(
+            pk__in=[entries[scope].pk for scope in stale]
+        ).delete()
+        for scope in stale:
+            rebuild_scope(scope)
+    if rating is None:
+        return
+    stats = scope_stats(scopes)
+    for scope in scopes:
+        place_title(
+            scope, title_id, rating, entries.get(scope),
+            stats.get(scope, (0, None))
+        )
+
+
+def place_title(scope, title_id, rating, entry, stats):
+    """Вставка или обновление места произведения в одном топе."""
+    size, lowest = stats
+    full = size >= settings.LEADERBOARD_SIZE
+    if entry is not None:
+        if full and rating < entry.rating:
+            others_lowest = board(scope).exclude(
+                title_id=title_id
+            ).order_by('rating', '-title_id').values_list(
+                'rating', 'title_id'
+            ).first()
+            if (
+                others_lowest is None
+                or rank_key(rating, title_id) < rank_key(*others_lowest)
+            ):
+                rebuild_scope(scope)
+                return
+        board(scope).filter(title_id=title_id).update(rating=rating)
+        return
+    if full:
+        if rating < lowest:
+            return
+        last = board(scope).order_by('rating', '-title_id').first()
+        if rank_key(rating, title_id) < rank_key(last.rating, last.title_id):
+            return
+        last.delete()
+    scope_type, scope_id = scope
+    # Одновременный первый отзыв мог уже вставить место произведения:
+    # update_or_create повторяет чтение после IntegrityError.
+    LeaderboardEntry.objects.update_or_create(
+        scope_type=scope_type,
+        scope_id=scope_id,
+        title_id=title_id,
+        defaults={'rating': rating},
+    )
+
+
+def remember_title_scopes(title):
+    """Запоминает топы удаляемого произведения до каскадного удаления."""
+    title._leaderboard_scopes = list(
+        LeaderboardEntry.objects.filter(title_id=title.pk).values_list(
+            'scope_type', 'scope_id'
+        )
+    )
+
+
+def rebuild_title_scopes(title):
+    """Пересобирает топы, из которых выбыло удалённое произведение."""
+    for scope in getattr(title, '_leaderboard_scopes', ()):
+        rebuild_scope(scope)
+
+
+def drop_scope(scope_type, scope_id):
+    """Удаляет топ удалённой категории или жанра."""
+    board((scope_type, scope_id)).delete()
@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.models import Review, SimilarTitle, Title
+from reviews.similarity import (np, read_links, title_vectors,
+                                top_neighbours)
+
+SCORE_PRECISION = 4
+
+
+class Command(BaseCommand):
+    help = (
+        'Построение списков похожих произведений по общим жанрам и общим '
+        'авторам отзывов. Сходство считается разреженными матрицами '
+        'блоками строк, списки полностью заменяются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int, default=settings.SIMILAR_TITLES_COUNT,
+            help='Число похожих произведений на произведение.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=256,
+            help='Число строк матрицы сходства в памяти за раз.'
+        )
+        parser.add_argument(
+            '--genre-weight', type=float,
+            default=settings.SIMILAR_TITLES_GENRE_WEIGHT,
+        )
+        parser.add_argument(
+            '--review-weight', type=float,
+            default=settings.SIMILAR_TITLES_REVIEW_WEIGHT,
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Размер пакета bulk_create.'
+        )
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError(
+                'Для расчёта сходства нужны пакеты numpy и scipy.'
+            )
+        if options['count'] < 1 or options['chunk_size'] < 1:
+            raise CommandError(
+                '--count и --chunk-size должны быть положительными.'
+            )
+        started = time.perf_counter()
+        title_ids = np.fromiter(
+            Title.objects.order_by('pk').values_list(
+                'pk', flat=True
+            ).iterator(),
+            dtype=np.int64,
+        )
+        vectors = title_vectors(
+            title_ids,
+            read_links(Title.genre.through.objects.order_by().values_list(
+                'title_id', 'genre_id'
+            )),
+            read_links(Review.objects.order_by().values_list(
+                'title_id', 'author_id'
+            )),
+            options['genre_weight'],
+            options['review_weight'],
+        )
+        stored = 0
+        with transaction.atomic():
+            SimilarTitle.objects.all().delete()
+            batch = []
+            for row, neighbours, scores in top_neighbours(
+                vectors, options['count'], options['chunk_size']
+            ):
+                batch.extend(
+                    SimilarTitle(
+                        title_id=int(title_ids[row]),
+                        similar_id=int(title_ids[neighbour]),
+                        position=position,
+                        score=round(float(score), SCORE_PRECISION),
+                    )
+                    for position, (neighbour, score)
+                    in enumerate(zip(neighbours, scores), 1)
+                )
+                if len(batch) >= options['batch_size']:
+                    SimilarTitle.objects.bulk_create(batch)
+                    stored += len(batch)
+                    batch = []
+            SimilarTitle.objects.bulk_create(batch)
+            stored += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Произведений: {len(title_ids)}, записано соседей: {stored}, '
+            f'{time.perf_counter() - started:.2f} с.'
+        ))
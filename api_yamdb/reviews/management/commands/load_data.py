@@ -4,6 +4,7 @@ import os
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from users.models import User
+from reviews.counters import recount
 from reviews.models import Category, Genre, Title, Review, Comment
 
 DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
@@ -94,9 +95,10 @@ class Command(BaseCommand):
                     title=title,
                     author=author,
                     text=row['text'],
-                    score=row['score'],
+                    score=int(row['score']),
                     pub_date=row['pub_date'],
                 )
+        recount('titles')
         self.stdout.write(self.style.SUCCESS('Reviews loaded'))
 
     def load_comments(self):
@@ -114,4 +116,5 @@ class Command(BaseCommand):
                     text=row['text'],
                     pub_date=row['pub_date'],
                 )
+        recount('reviews')
         self.stdout.write(self.style.SUCCESS('Comments loaded'))
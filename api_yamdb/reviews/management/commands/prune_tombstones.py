@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reviews.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление отметок об удалении старше срока хранения '
+        '(CHANGES_TOMBSTONE_RETENTION_DAYS). Курсоры ленты изменений '
+        'старше этого срока перестают приниматься.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=settings.CHANGES_TOMBSTONE_RETENTION_DAYS,
+            help='Срок хранения в днях.'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < settings.CHANGES_TOMBSTONE_RETENTION_DAYS:
+            raise CommandError(
+                '--days не может быть меньше '
+                'CHANGES_TOMBSTONE_RETENTION_DAYS: лента принимала бы '
+                'курсоры, для которых отметки уже удалены.'
+            )
+        deleted = prune_tombstones(
+            timezone.now() - timedelta(days=options['days'])
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено отметок об удалении: {deleted}.'
+        ))
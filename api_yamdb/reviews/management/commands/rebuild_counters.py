@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from reviews.counters import COUNTERS, find_drift, recount
+
+REPORTED_IDS_LIMIT = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверка и пересчёт денормализованных счётчиков: суммы и числа '
+        'оценок произведений, числа комментариев отзывов, числа '
+        'произведений категорий и жанров. Таблицы обходятся диапазонами '
+        'id, пересчитываются только расходящиеся строки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'counters', nargs='*',
+            help=f'Группы счётчиков: {", ".join(COUNTERS)}. '
+                 'По умолчанию все.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения, ничего не записывая.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Размер диапазона id, обрабатываемого за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['counters'] or list(COUNTERS)
+        unknown = [name for name in names if name not in COUNTERS]
+        if unknown:
+            raise CommandError(
+                f'Неизвестные группы счётчиков: {", ".join(unknown)}.'
+            )
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        for name in names:
+            drift = self.rebuild(
+                name, options['chunk_size'], options['dry_run']
+            )
+            self.report(name, drift, options['dry_run'])
+
+    def rebuild(self, name, chunk_size, dry_run):
+        """Id расходящихся объектов; без dry_run они пересчитываются."""
+        model, _ = COUNTERS[name]
+        drift = []
+        for start, end in self.id_ranges(model, chunk_size):
+            with transaction.atomic():
+                pks = find_drift(
+                    name, model.objects.filter(pk__gte=start, pk__lt=end)
+                )
+                if pks and not dry_run:
+                    recount(name, model.objects.filter(pk__in=pks))
+            drift.extend(pks)
+        return drift
+
+    def id_ranges(self, model, chunk_size):
+        """Полуинтервалы [start, end) id объектов модели."""
+        bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            return
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            yield start, start + chunk_size
+
+    def report(self, name, drift, dry_run):
+        """Вывод числа расхождений по группе счётчиков."""
+        if not drift:
+            self.stdout.write(f'{name}: расхождений нет.')
+            return
+        ids = ', '.join(map(str, drift[:REPORTED_IDS_LIMIT]))
+        if len(drift) > REPORTED_IDS_LIMIT:
+            ids += ', ...'
+        action = 'найдено' if dry_run else 'исправлено'
+        self.stdout.write(self.style.WARNING(
+            f'{name}: {action} расхождений: {len(drift)} (id: {ids}).'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from reviews.counters import rebuild_histograms
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересборка распределений оценок всех произведений одним '
+        'агрегирующим запросом к отзывам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пакета bulk_create.'
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_histograms(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобрано распределений: {created}.'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import rebuild_all
+
+
+class Command(BaseCommand):
+    help = (
+        'Полная пересборка топов произведений всех категорий и жанров. '
+        'Между запусками топы обновляются инкрементально при изменении '
+        'отзывов.'
+    )
+
+    def handle(self, *args, **options):
+        scopes = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобрано топов: {scopes}.'
+        ))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Title
+from reviews.rating_table import get_table, write_titles
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполнение общей таблицы рейтингов (RATING_TABLE_PATH) из '
+        'счётчиков произведений. Между запусками таблица обновляется при '
+        'изменении отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Число строк, читаемых из БД за раз.'
+        )
+
+    def handle(self, *args, **options):
+        table = get_table()
+        if table is None:
+            raise CommandError('Не задан путь RATING_TABLE_PATH.')
+        started = time.perf_counter()
+        written = write_titles(
+            table, Title.objects.all(), chunk_size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано произведений: {written}, '
+            f'{time.perf_counter() - started:.2f} с.'
+        ))
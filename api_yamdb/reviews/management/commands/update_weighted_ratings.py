@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from reviews import cache_versions
+from reviews.models import Title
+from reviews.ratings import PRIORS, group_indexes, np, weighted_ratings
+
+RATING_PRECISION = 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчёт взвешенного (байесовского) рейтинга всех произведений. '
+        'Суммы и числа оценок берутся из счётчиков произведений (при '
+        'расхождениях сначала запустите rebuild_counters), рейтинг '
+        'считается одним векторным проходом NumPy, записываются только '
+        'изменившиеся значения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prior', choices=PRIORS,
+            default=settings.WEIGHTED_RATING_PRIOR,
+            help='Априорное среднее: по категории или по всему каталогу.'
+        )
+        parser.add_argument(
+            '--prior-weight', type=float,
+            default=settings.WEIGHTED_RATING_PRIOR_WEIGHT,
+            help='Вес априорного среднего в числе оценок.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пакета bulk_update.'
+        )
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError('Для расчёта рейтинга нужен пакет numpy.')
+        if options['prior_weight'] < 0:
+            raise CommandError('--prior-weight не может быть отрицательным.')
+        started = time.perf_counter()
+        rows = list(Title.objects.order_by('pk').values_list(
+            'pk', 'category_id', 'score_sum', 'score_count',
+            'weighted_rating'
+        ))
+        if not rows:
+            self.stdout.write('Произведений нет.')
+            return
+        pks, categories, sums, counts, current = zip(*rows)
+        ratings = np.round(weighted_ratings(
+            sums,
+            counts,
+            group_indexes(categories),
+            options['prior_weight'],
+            options['prior'],
+        ), RATING_PRECISION)
+        current = np.array(current, dtype=np.float64)
+        changed = np.flatnonzero(
+            ~np.isclose(ratings, current, rtol=0, equal_nan=True)
+        )
+        computed = time.perf_counter() - started
+        updated_at = timezone.now()
+        with transaction.atomic():
+            Title.objects.bulk_update(
+                (
+                    Title(
+                        pk=pks[index],
+                        weighted_rating=(
+                            None if np.isnan(ratings[index])
+                            else float(ratings[index])
+                        ),
+                        updated_at=updated_at,
+                    )
+                    for index in changed
+                ),
+                ('weighted_rating', 'updated_at'),
+                batch_size=options['batch_size'],
+            )
+            cache_versions.catalog_changed()
+        self.stdout.write(self.style.SUCCESS(
+            f'Произведений: {len(pks)}, обновлено: {len(changed)}, '
+            f'расчёт {computed:.2f} с, всего '
+            f'{time.perf_counter() - started:.2f} с.'
+        ))
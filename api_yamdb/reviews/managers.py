@@ -0,0 +1,71 @@
+from collections import Counter
+
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed
+
+
+class TitleManager(models.Manager):
+    """Менеджер произведений."""
+
+    def bulk_create_with_genres(self, items):
+        """
+        Массовое создание произведений вместе с жанрами в одной транзакции.
+
+        `items` — список пар (несохранённое произведение, список жанров).
+        Связи с жанрами вставляются одним bulk_create с отправкой сигналов
+        m2m_changed. Если БД не возвращает id из массовой вставки (SQLite
+        в Django 3.2), произведения сохраняются по одному.
+
+        bulk_create не отправляет post_save, поэтому число произведений
+        категорий в этом случае обновляется здесь же.
+        """
+        titles = [title for title, _ in items]
+        through = self.model.genre.through
+        genre_model = self.model.genre.field.related_model
+        with transaction.atomic(using=self.db):
+            features = connections[self.db].features
+            if features.can_return_rows_from_bulk_insert:
+                self.bulk_create(titles)
+                self._count_category_titles(titles)
+            else:
+                for title in titles:
+                    title.save(using=self.db)
+            links = {
+                title: {genre.pk for genre in genres}
+                for title, genres in items
+            }
+            self._send_genres_changed('pre_add', links, genre_model)
+            through.objects.using(self.db).bulk_create(
+                through(title_id=title.pk, genre_id=genre_id)
+                for title, genre_ids in links.items()
+                for genre_id in genre_ids
+            )
+            self._send_genres_changed('post_add', links, genre_model)
+        return titles
+
+    def _count_category_titles(self, titles):
+        """Увеличивает число произведений категорий созданных произведений."""
+        category_model = self.model.category.field.related_model
+        counts = Counter(
+            title.category_id for title in titles
+            if title.category_id is not None
+        )
+        for category_id, count in counts.items():
+            category_model.objects.using(self.db).filter(
+                pk=category_id
+            ).update(title_count=F('title_count') + count)
+
+    def _send_genres_changed(self, action, links, genre_model):
+        """Сигналы m2m_changed для каждого произведения."""
+        for title, genre_ids in links.items():
+            if genre_ids:
+                m2m_changed.send(
+                    sender=self.model.genre.through,
+                    instance=title,
+                    action=action,
+                    reverse=False,
+                    model=genre_model,
+                    pk_set=set(genre_ids),
+                    using=self.db,
+                )
@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-19 11:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counters(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = Comment.objects.filter(review_id=OuterRef('pk')).order_by()
+    Review.objects.update(
+        comment_count=Coalesce(Subquery(
+            comments.values('review_id').annotate(
+                total=Count('pk')
+            ).values('total')
+        ), 0),
+        last_comment_at=Subquery(
+            comments.order_by('-pub_date').values('pub_date')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_remove_title_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число комментариев'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего комментария'),
+        ),
+        migrations.RunPython(
+            fill_comment_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2 on 2026-10-19 11:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_title_counts(apps, schema_editor):
+    Category = apps.get_model('reviews', 'Category')
+    Genre = apps.get_model('reviews', 'Genre')
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.filter(category_id=OuterRef('pk')).order_by()
+    Category.objects.update(title_count=Coalesce(Subquery(
+        titles.values('category_id').annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0))
+    links = Title.genre.through.objects.filter(
+        genre_id=OuterRef('pk')
+    ).order_by()
+    Genre.objects.update(title_count=Coalesce(Subquery(
+        links.values('genre_id').annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='title_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число произведений'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='title_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число произведений'),
+        ),
+        migrations.RunPython(fill_title_counts, migrations.RunPython.noop),
+    ]
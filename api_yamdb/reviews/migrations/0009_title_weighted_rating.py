@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_score_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, db_index=True, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+    ]
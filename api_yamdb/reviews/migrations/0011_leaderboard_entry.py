@@ -0,0 +1,73 @@
+# Generated by Django 3.2 on 2026-10-19 11:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import NullIf
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Category = apps.get_model('reviews', 'Category')
+    Genre = apps.get_model('reviews', 'Genre')
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    rating_expression = ExpressionWrapper(
+        F('score_sum') * 1.0 / NullIf(F('score_count'), 0),
+        output_field=FloatField(),
+    )
+    scopes = [
+        ('category', 'category_id', pk)
+        for pk in Category.objects.values_list('pk', flat=True)
+    ] + [
+        ('genre', 'genre', pk)
+        for pk in Genre.objects.values_list('pk', flat=True)
+    ]
+    for scope_type, lookup, scope_id in scopes:
+        rows = Title.objects.filter(
+            score_count__gt=0, **{lookup: scope_id}
+        ).annotate(rating=rating_expression).order_by('-rating', 'pk').values_list(
+            'pk', 'rating'
+        )[:settings.LEADERBOARD_SIZE]
+        LeaderboardEntry.objects.bulk_create(
+            LeaderboardEntry(
+                scope_type=scope_type,
+                scope_id=scope_id,
+                title_id=title_id,
+                rating=rating,
+            )
+            for title_id, rating in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope_type', models.CharField(choices=[('category', 'Категория'), ('genre', 'Жанр')], max_length=16, verbose_name='Тип топа')),
+                ('scope_id', models.PositiveBigIntegerField(verbose_name='Id категории или жанра')),
+                ('rating', models.FloatField(verbose_name='Рейтинг')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в топе',
+                'verbose_name_plural': 'Места в топах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['scope_type', 'scope_id', '-rating', 'title'], name='leaderboard_scope_rating'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('scope_type', 'scope_id', 'title'), name='unique_leaderboard_title'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models.signals import m2m_changed
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from reviews.basemodels import BaseComment
+from .managers import TitleManager
 from .constants import (
     TITLE_NAME_LENGTH,
     CATEGORY_NAME_LENGTH,
@@ -24,6 +27,10 @@ class Category(models.Model):
         unique=True,
         max_length=CATEGORY_SLUG_LENGTH
     )
+    title_count = models.PositiveIntegerField(
+        'Число произведений',
+        default=0,
+    )
 
     class Meta:
         """Мета-класс для категории."""
@@ -48,6 +55,10 @@ class Genre(models.Model):
         unique=True,
         max_length=GENRE_SLUG_LENGTH
     )
+    title_count = models.PositiveIntegerField(
+        'Число произведений',
+        default=0,
+    )
 
     class Meta:
         """Мета-класс для жанров."""
@@ -92,6 +103,27 @@ class Title(models.Model):
         null=True,
         default=None
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+    )
+    score_count = models.PositiveIntegerField(
+        'Число оценок',
+        default=0,
+    )
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг',
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True,
+    )
+
+    objects = TitleManager()
 
     class Meta:
         """Мета-класс для модели произведений."""
@@ -104,6 +136,196 @@ class Title(models.Model):
         """Строковое представление модели произведений."""
         return self.name
 
+    def set_genres(self, genres, created=False):
+        """
+        Замена жанров произведения по разнице с текущими.
+
+        Выполняет не больше одного удаления и одной массовой вставки в
+        промежуточную таблицу (для нового произведения — только вставку)
+        и отправляет те же сигналы m2m_changed, что и `genre.set()`.
+        """
+        through = Title.genre.through
+        genre_ids = {genre.pk for genre in genres}
+        current_ids = set() if created else set(
+            through.objects.filter(title_id=self.pk).values_list(
+                'genre_id', flat=True
+            )
+        )
+        removed = current_ids - genre_ids
+        added = genre_ids - current_ids
+        with transaction.atomic():
+            if removed:
+                self._send_genre_changed('pre_remove', removed)
+                through.objects.filter(
+                    title_id=self.pk, genre_id__in=removed
+                ).delete()
+                self._send_genre_changed('post_remove', removed)
+            if added:
+                self._send_genre_changed('pre_add', added)
+                through.objects.bulk_create(
+                    through(title_id=self.pk, genre_id=genre_id)
+                    for genre_id in added
+                )
+                self._send_genre_changed('post_add', added)
+        getattr(self, '_prefetched_objects_cache', {}).pop('genre', None)
+
+    def _send_genre_changed(self, action, pk_set):
+        """Сигнал m2m_changed об изменении жанров произведения."""
+        m2m_changed.send(
+            sender=Title.genre.through,
+            instance=self,
+            action=action,
+            reverse=False,
+            model=Genre,
+            pk_set=set(pk_set),
+            using=self._state.db,
+        )
+
+
+class TitleScoreHistogram(models.Model):
+    """
+    Распределение оценок произведения.
+
+    Хранит по счётчику на каждую оценку (поля score_1 ... score_10) и
+    обновляется вместе с отзывами; строки нет, пока нет ни одной оценки.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        related_name='score_histogram',
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+    )
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+
+    class Meta:
+        """Мета-класс для распределения оценок."""
+
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    @staticmethod
+    def field_name(score):
+        """Имя поля счётчика оценки."""
+        return f'score_{score}'
+
+    @classmethod
+    def score_fields(cls):
+        """Пары (оценка, имя поля) для всех допустимых оценок."""
+        return [
+            (score, cls.field_name(score))
+            for score in range(REVIEW_SCORE_MIN, REVIEW_SCORE_MAX + 1)
+        ]
+
+    def __str__(self):
+        """Строковое представление распределения оценок."""
+        return f'Оценки: {self.title_id}'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Место произведения в топе категории или жанра.
+
+    Топы хранят не больше LEADERBOARD_SIZE лучших по средней оценке
+    произведений каждой категории и каждого жанра и читаются одним
+    диапазонным сканированием индекса (scope_type, scope_id, -rating).
+    """
+
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    SCOPE_CHOICES = (
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    )
+
+    scope_type = models.CharField(
+        'Тип топа',
+        max_length=16,
+        choices=SCOPE_CHOICES,
+    )
+    scope_id = models.PositiveBigIntegerField('Id категории или жанра')
+    title = models.ForeignKey(
+        Title,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+    )
+    rating = models.FloatField('Рейтинг')
+
+    class Meta:
+        """Мета-класс для места в топе."""
+
+        verbose_name = 'Место в топе'
+        verbose_name_plural = 'Места в топах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('scope_type', 'scope_id', 'title'),
+                name='unique_leaderboard_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=('scope_type', 'scope_id', '-rating', 'title'),
+                name='leaderboard_scope_rating'
+            )
+        ]
+
+    def __str__(self):
+        """Строковое представление места в топе."""
+        return f'{self.scope_type} {self.scope_id}: {self.title_id}'
+
+
+class SimilarTitle(models.Model):
+    """
+    Похожее произведение из предрассчитанного списка соседей.
+
+    Списки строит команда build_similar_titles по общим жанрам и общим
+    авторам отзывов; на запрос отдаются одним сканированием индекса
+    (title, position).
+    """
+
+    title = models.ForeignKey(
+        Title,
+        related_name='similar_entries',
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+    )
+    similar = models.ForeignKey(
+        Title,
+        related_name='+',
+        verbose_name='Похожее произведение',
+        on_delete=models.CASCADE,
+    )
+    position = models.PositiveSmallIntegerField('Позиция')
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        """Мета-класс для похожих произведений."""
+
+        ordering = ('title', 'position')
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'position'),
+                name='unique_similar_title_position'
+            )
+        ]
+
+    def __str__(self):
+        """Строковое представление похожего произведения."""
+        return f'{self.title_id} -> {self.similar_id}'
+
 
 class Review(BaseComment):
     """Модель отзыва."""
@@ -121,6 +343,15 @@ class Review(BaseComment):
             MaxValueValidator(REVIEW_SCORE_MAX)
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+    )
+    last_comment_at = models.DateTimeField(
+        'Дата последнего комментария',
+        blank=True,
+        null=True,
+    )
 
     class Meta(BaseComment.Meta):
         """Мета-класс для модели отзыва."""
@@ -162,3 +393,44 @@ class Comment(BaseComment):
     def __str__(self):
         """Строковое представление модели комментария."""
         return self.text
+
+
+class Tombstone(models.Model):
+    """
+    Отметка об удалении произведения, отзыва или комментария.
+
+    Нужна ленте изменений (/api/v1/changes/): клиент, синхронизирующий
+    каталог по курсору, узнаёт из неё, какие объекты удалить у себя.
+    """
+
+    TITLE = 'title'
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    KIND_CHOICES = (
+        (TITLE, 'Произведение'),
+        (REVIEW, 'Отзыв'),
+        (COMMENT, 'Комментарий'),
+    )
+
+    kind = models.CharField(
+        'Тип объекта',
+        max_length=16,
+        choices=KIND_CHOICES,
+    )
+    object_id = models.PositiveBigIntegerField('Id объекта')
+    deleted_at = models.DateTimeField(
+        'Дата удаления',
+        default=timezone.now,
+        db_index=True,
+    )
+
+    class Meta:
+        """Мета-класс для отметки об удалении."""
+
+        ordering = ('deleted_at', 'pk')
+        verbose_name = 'Удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
+
+    def __str__(self):
+        """Строковое представление отметки об удалении."""
+        return f'{self.kind} {self.object_id}'
@@ -0,0 +1,249 @@
+import math
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Title
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b'YRT1'
+HEADER = struct.Struct('<4s')
+# Запись произведения: счётчик версии, сумма и число оценок, рейтинг.
+RECORD = struct.Struct('<QIId')
+SEQUENCE = struct.Struct('<Q')
+READ_RETRIES = 100
+# Рейтинг стёртой записи: запись есть, но значения нужно брать из БД.
+CLEARED = math.nan
+
+
+class RatingTable:
+    """
+    Таблица рейтингов произведений в отображённом в память файле.
+
+    Записи фиксированного размера лежат по смещению, зависящему от id
+    произведения, поэтому чтение — одно обращение к памяти без запроса к
+    БД и без копии данных в каждом процессе. Все процессы отображают
+    один файл (лучше на tmpfs, например /dev/shm).
+
+    Запись защищена seqlock: писатель делает счётчик версии нечётным,
+    пишет поля и делает его снова чётным; читатель повторяет чтение, если
+    видит нечётный или изменившийся счётчик. Писатели разных процессов
+    сериализуются блокировкой файла (flock), читатели блокировок не
+    берут. Файл растёт удвоением, когда id не помещается.
+
+    Отображение и число записей в нём хранятся одной парой `mapping`,
+    которая заменяется целиком под блокировкой потоков, поэтому читатель
+    не увидит число записей от одного отображения, а память от другого.
+    """
+
+    def __init__(self, path, capacity):
+        self.path = path
+        self._lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self.locked():
+            if os.fstat(self.fd).st_size == 0:
+                os.write(self.fd, HEADER.pack(MAGIC))
+                os.ftruncate(self.fd, self.offset(capacity))
+            self.remap()
+        if HEADER.unpack_from(self.map, 0)[0] != MAGIC:
+            raise ValueError(f'{path} не является таблицей рейтингов.')
+
+    @property
+    def map(self):
+        """Текущее отображение файла."""
+        return self.mapping[0]
+
+    @property
+    def capacity(self):
+        """Число записей в текущем отображении."""
+        return self.mapping[1]
+
+    def offset(self, title_id):
+        """Смещение записи произведения в файле."""
+        return HEADER.size + title_id * RECORD.size
+
+    def remap(self):
+        """
+        Отображение файла в память целиком по текущему размеру.
+
+        Вызывается под блокировкой потоков `_lock`.
+        """
+        size = os.fstat(self.fd).st_size
+        self.mapping = (
+            mmap.mmap(self.fd, size),
+            (size - HEADER.size) // RECORD.size,
+        )
+
+    @contextmanager
+    def locked(self):
+        """
+        Исключительная блокировка на время записи.
+
+        flock разделяет процессы, но не потоки одного процесса, которые
+        используют общее описание файла, поэтому берётся и блокировка
+        потоков.
+        """
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def get(self, title_id):
+        """
+        Тройка (сумма, число оценок, рейтинг) или None.
+
+        None означает, что записи нет, она стёрта или её не удалось
+        прочитать согласованно, и рейтинг нужно взять из БД.
+        """
+        table_map, capacity = self.mapping
+        if title_id >= capacity:
+            if os.fstat(self.fd).st_size <= self.offset(title_id):
+                return None
+            with self._lock:
+                if title_id >= self.capacity:
+                    self.remap()
+                table_map, capacity = self.mapping
+        offset = self.offset(title_id)
+        for _ in range(READ_RETRIES):
+            sequence, score_sum, score_count, rating = RECORD.unpack_from(
+                table_map, offset
+            )
+            if sequence & 1:
+                continue
+            if SEQUENCE.unpack_from(table_map, offset)[0] != sequence:
+                continue
+            if sequence == 0 or math.isnan(rating):
+                return None
+            return score_sum, score_count, rating if score_count else None
+        return None
+
+    def put(self, title_id, score_sum, score_count):
+        """Запись счётчиков и рейтинга произведения."""
+        with self.locked():
+            self.store(title_id, score_sum, score_count)
+
+    def store(self, title_id, score_sum, score_count):
+        """Запись счётчиков и рейтинга; вызывается под блокировкой."""
+        if title_id >= self.capacity:
+            self.grow(title_id)
+        self.write(
+            title_id, score_sum, score_count,
+            score_sum / score_count if score_count else 0.0,
+        )
+
+    def write(self, title_id, score_sum, score_count, rating):
+        """Запись полей под seqlock; вызывается под блокировкой."""
+        table_map = self.map
+        offset = self.offset(title_id)
+        sequence = SEQUENCE.unpack_from(table_map, offset)[0]
+        SEQUENCE.pack_into(table_map, offset, sequence + 1)
+        RECORD.pack_into(
+            table_map, offset, sequence + 1, score_sum, score_count, rating
+        )
+        SEQUENCE.pack_into(table_map, offset, sequence + 2)
+
+    def clear(self):
+        """
+        Стирание всех записей, например после смены базы данных.
+
+        Размер файла не меняется: другие процессы продолжают читать свои
+        отображения. Счётчики версий не сбрасываются, а растут, так что
+        читатель, начавший чтение до стирания, повторит его.
+        """
+        with self.locked():
+            table_map = self.map
+            for title_id in range(self.capacity):
+                sequence = SEQUENCE.unpack_from(
+                    table_map, self.offset(title_id)
+                )[0]
+                if sequence:
+                    self.write(title_id, 0, 0, CLEARED)
+
+    def grow(self, title_id):
+        """Увеличение файла, чтобы поместилась запись `title_id`."""
+        size = os.fstat(self.fd).st_size
+        capacity = (size - HEADER.size) // RECORD.size
+        if title_id >= capacity:
+            capacity = max(capacity * 2, title_id + 1)
+            os.ftruncate(self.fd, self.offset(capacity))
+        self.remap()
+
+
+@lru_cache(maxsize=None)
+def open_table(path, capacity, pid):
+    """
+    Таблица, открытая этим процессом.
+
+    `pid` входит в ключ: после fork дочерний процесс открывает файл
+    заново, иначе flock на общем описании файла не разделял бы писателей.
+    """
+    return RatingTable(path, capacity)
+
+
+def get_table():
+    """Таблица из настройки RATING_TABLE_PATH или None, если выключена."""
+    if not settings.RATING_TABLE_PATH:
+        return None
+    return open_table(
+        settings.RATING_TABLE_PATH, settings.RATING_TABLE_CAPACITY,
+        os.getpid()
+    )
+
+
+def write_titles(table, queryset, chunk_size=2000):
+    """
+    Перенос счётчиков произведений выборки в таблицу.
+
+    Счётчики читаются из БД под блокировкой таблицы. Иначе два
+    параллельных переноса могли бы записать значения в обратном порядке,
+    и в таблице остался бы более старый рейтинг.
+    """
+    count = 0
+    with table.locked():
+        for title_id, score_sum, score_count in queryset.order_by(
+        ).values_list('pk', 'score_sum', 'score_count').iterator(
+            chunk_size=chunk_size
+        ):
+            table.store(title_id, score_sum, score_count)
+            count += 1
+    return count
+
+
+def refresh_titles(queryset):
+    """Перенос счётчиков произведений выборки в таблицу после фиксации."""
+    table = get_table()
+    if table is not None:
+        transaction.on_commit(lambda: write_titles(table, queryset))
+
+
+def title_changed(title_id):
+    """Перенос счётчиков одного произведения в таблицу после фиксации."""
+    refresh_titles(Title.objects.filter(pk=title_id))
+
+
+def title_deleted(title_id):
+    """Обнуление записи удалённого произведения."""
+    table = get_table()
+    if table is not None:
+        transaction.on_commit(lambda: table.put(title_id, 0, 0))
+
+
+def clear_table():
+    """Стирание общей таблицы, если она включена."""
+    table = get_table()
+    if table is not None:
+        table.clear()
@@ -0,0 +1,59 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PRIOR_GLOBAL = 'global'
+PRIOR_CATEGORY = 'category'
+PRIORS = (PRIOR_GLOBAL, PRIOR_CATEGORY)
+NO_GROUP = -1
+
+
+def weighted_ratings(sums, counts, groups, prior_weight,
+                     prior=PRIOR_CATEGORY):
+    """
+    Байесовский рейтинг всех произведений за один векторный проход.
+
+    rating = (C * m + sum) / (C + n), где sum и n — сумма и число оценок
+    произведения, C — вес априорного среднего `prior_weight`, m — среднее
+    по всем оценкам каталога или по категории произведения. Для
+    произведений без категории и категорий без оценок берётся среднее по
+    каталогу. `groups` — номера категорий от 0 или NO_GROUP. У
+    произведений без оценок рейтинг NaN.
+    """
+    sums = np.asarray(sums, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    global_mean = sums.sum() / total if total else 0.0
+    prior_mean = np.full(sums.shape, global_mean)
+    groups = np.asarray(groups, dtype=np.int64)
+    grouped = groups != NO_GROUP
+    if prior == PRIOR_CATEGORY and grouped.any():
+        size = groups[grouped].max() + 1
+        group_sums = np.bincount(
+            groups[grouped], weights=sums[grouped], minlength=size
+        )
+        group_counts = np.bincount(
+            groups[grouped], weights=counts[grouped], minlength=size
+        )
+        group_means = np.divide(
+            group_sums,
+            group_counts,
+            out=np.full(size, global_mean),
+            where=group_counts > 0,
+        )
+        prior_mean[grouped] = group_means[groups[grouped]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratings = (prior_weight * prior_mean + sums) / (prior_weight + counts)
+    ratings[counts == 0] = np.nan
+    return ratings
+
+
+def group_indexes(keys):
+    """Номера групп от 0 для ключей, NO_GROUP для None."""
+    keys = np.array(keys, dtype=np.float64)
+    missing = np.isnan(keys)
+    groups = np.full(keys.shape, NO_GROUP, dtype=np.int64)
+    if not missing.all():
+        _, groups[~missing] = np.unique(keys[~missing], return_inverse=True)
+    return groups
@@ -0,0 +1,119 @@
+import threading
+
+from django.core.cache import cache
+from django.db import router, transaction
+
+from .models import Category, Genre
+
+REFERENCE_VERSION_PREFIX = 'reference-version'
+
+
+class ReferenceCache:
+    """
+    Процессный кэш справочника (жанров или категорий).
+
+    Хранит соответствие slug -> (id, name) и упорядоченный список
+    (name, slug). Загружается лениво одним запросом и сбрасывается
+    сигналами post_save/post_delete. Другие процессы узнают об изменениях
+    по версии в общем кэше Django: при её смене справочник перечитывается.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = (
+            f'{REFERENCE_VERSION_PREFIX}:{model._meta.label_lower}'
+        )
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_slug = None
+        self._ordered = None
+
+    def __deepcopy__(self, memo):
+        # Кэш общий для процесса: DRF копирует аргументы полей
+        # сериализатора, но копия кэша не нужна.
+        return self
+
+    def get_shared_version(self):
+        """Текущая версия справочника в общем кэше."""
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, 1, None)
+            version = cache.get(self.version_key, 1)
+        return version
+
+    def load(self):
+        """Данные справочника, перечитанные при смене версии."""
+        version = self.get_shared_version()
+        if self._by_slug is not None and self._version == version:
+            return self._by_slug, self._ordered
+        with self._lock:
+            if self._by_slug is None or self._version != version:
+                rows = list(
+                    self.model.objects.values_list('pk', 'name', 'slug')
+                )
+                self._by_slug = {slug: (pk, name) for pk, name, slug in rows}
+                self._ordered = [(name, slug) for _, name, slug in rows]
+                self._version = version
+            return self._by_slug, self._ordered
+
+    def get(self, slug):
+        """Пара (id, name) по slug или None."""
+        by_slug, _ = self.load()
+        return by_slug.get(slug)
+
+    def get_instance(self, slug):
+        """Объект модели по slug без запроса к БД или None."""
+        entry = self.get(slug)
+        if entry is None:
+            return None
+        return self.make_instance(slug, entry)
+
+    def get_many(self, slugs):
+        """Словарь slug -> объект модели для известных slug из списка."""
+        by_slug, _ = self.load()
+        instances = {}
+        for slug in slugs:
+            try:
+                entry = by_slug.get(slug)
+            except TypeError:
+                continue
+            if entry is not None:
+                instances[slug] = self.make_instance(slug, entry)
+        return instances
+
+    def make_instance(self, slug, entry):
+        """Объект модели из записи справочника."""
+        pk, name = entry
+        return self.model.from_db(
+            router.db_for_read(self.model),
+            ['id', 'name', 'slug'],
+            [pk, name, slug]
+        )
+
+    def rows(self):
+        """Список (name, slug) в порядке сортировки модели."""
+        _, ordered = self.load()
+        return ordered
+
+    def invalidate(self):
+        """Сбрасывает справочник в этом и во всех остальных процессах."""
+        with self._lock:
+            self._by_slug = None
+            self._ordered = None
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+
+    def invalidate_on_commit(self):
+        """
+        Сброс справочника после фиксации текущей транзакции.
+
+        При сбросе до фиксации другой процесс мог бы перечитать ещё старые
+        строки под новой версией и держать их до следующего изменения.
+        """
+        transaction.on_commit(self.invalidate)
+
+
+genre_cache = ReferenceCache(Genre)
+category_cache = ReferenceCache(Category)
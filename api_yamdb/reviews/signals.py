@@ -0,0 +1,348 @@
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache_versions, leaderboards, rating_table
+from .counters import (change_title_count, comment_added, comment_removed,
+                       review_added, review_removed, review_score_changed)
+from .models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                     Title, Tombstone)
+from .reference import category_cache, genre_cache
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_genre_cache(**kwargs):
+    """Сброс кэша жанров при изменении жанра."""
+    genre_cache.invalidate_on_commit()
+
+
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_category_cache(**kwargs):
+    """Сброс кэша категорий при изменении категории."""
+    category_cache.invalidate_on_commit()
+
+
+@receiver(post_migrate)
+def invalidate_reference_caches(**kwargs):
+    """Сброс справочников после migrate и flush."""
+    genre_cache.invalidate()
+    category_cache.invalidate()
+
+
+@receiver(pre_save, sender=Title)
+def remember_title_category(instance, raw=False, **kwargs):
+    """Запоминает прежнюю категорию произведения перед сохранением."""
+    instance._previous_category_id = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_category_id = (
+        Title.objects.filter(pk=instance.pk)
+        .values_list('category_id', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Title)
+def count_title_category(instance, created, raw=False, **kwargs):
+    """Обновляет число произведений категорий при создании и смене."""
+    if raw:
+        return
+    previous = None if created else instance._previous_category_id
+    if previous == instance.category_id:
+        return
+    change_title_count(Category, [previous], -1)
+    change_title_count(Category, [instance.category_id], 1)
+
+
+@receiver(pre_delete, sender=Title)
+def uncount_title_genres(instance, **kwargs):
+    """
+    Уменьшает число произведений жанров удаляемого произведения.
+
+    Связи удаляются каскадом без сигнала m2m_changed, поэтому жанры
+    выбираются до удаления.
+    """
+    change_title_count(
+        Genre,
+        list(Title.genre.through.objects.filter(
+            title_id=instance.pk
+        ).values_list('genre_id', flat=True)),
+        -1
+    )
+
+
+@receiver(post_delete, sender=Title)
+def uncount_title_category(instance, **kwargs):
+    """Уменьшает число произведений категории удалённого произведения."""
+    change_title_count(Category, [instance.category_id], -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def count_genre_titles(instance, action, reverse, pk_set, **kwargs):
+    """Обновляет число произведений жанров при изменении связей."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    delta = -1 if action != 'post_add' else 1
+    if action == 'pre_clear':
+        if reverse:
+            Genre.objects.filter(pk=instance.pk).update(title_count=0)
+            return
+        pk_set = list(Title.genre.through.objects.filter(
+            title_id=instance.pk
+        ).values_list('genre_id', flat=True))
+    if reverse:
+        change_title_count(Genre, [instance.pk], delta * len(pk_set))
+    else:
+        change_title_count(Genre, pk_set, delta)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(instance, raw=False, **kwargs):
+    """Запоминает прежнюю оценку отзыва перед сохранением."""
+    instance._previous_score = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_score = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list('score', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def count_review_score(instance, created, raw=False, **kwargs):
+    """Учитывает новый отзыв или новую оценку в счётчиках произведения."""
+    if raw:
+        return
+    if created:
+        review_added(instance)
+    elif instance._previous_score is not None:
+        review_score_changed(instance, instance._previous_score)
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review_score(instance, **kwargs):
+    """
+    Учитывает удаление отзыва в счётчиках произведения.
+
+    Срабатывает и при каскадном удалении отзывов вместе с пользователем.
+    """
+    review_removed(instance)
+
+
+@receiver(post_save, sender=Review)
+def move_reviewed_title_leaderboards(instance, created, raw=False,
+                                     **kwargs):
+    """Обновляет топы произведения после нового отзыва или новой оценки."""
+    if raw:
+        return
+    if created or instance._previous_score not in (None, instance.score):
+        leaderboards.refresh_title(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def drop_reviewed_title_leaderboards(instance, **kwargs):
+    """
+    Обновляет топы произведения после удаления отзыва.
+
+    Срабатывает и при каскадном удалении отзывов вместе с пользователем.
+    """
+    leaderboards.refresh_title(instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_review_comment(instance, created, raw=False, **kwargs):
+    """Учитывает новый комментарий в счётчиках отзыва."""
+    if created and not raw:
+        comment_added(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_review_comment(instance, **kwargs):
+    """
+    Учитывает удаление комментария в счётчиках отзыва.
+
+    Срабатывает и при каскадном удалении комментариев вместе с
+    пользователем, отзывом или произведением.
+    """
+    comment_removed(instance.review_id)
+
+
+@receiver(post_save, sender=Title)
+def move_title_leaderboards(instance, created, raw=False, **kwargs):
+    """Переносит произведение в топ новой категории."""
+    if raw or created:
+        return
+    if instance._previous_category_id != instance.category_id:
+        leaderboards.refresh_title(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def move_genre_leaderboards(instance, action, reverse, pk_set, **kwargs):
+    """Обновляет топы жанров при изменении жанров произведения."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        leaderboards.rebuild_scope((LeaderboardEntry.GENRE, instance.pk))
+    elif instance.score_count:
+        # Произведение без оценок не входит ни в один топ, например
+        # только что созданное.
+        leaderboards.refresh_title(instance.pk)
+
+
+@receiver(pre_delete, sender=Title)
+def remember_title_leaderboards(instance, **kwargs):
+    """Запоминает топы удаляемого произведения."""
+    leaderboards.remember_title_scopes(instance)
+
+
+@receiver(post_delete, sender=Title)
+def rebuild_title_leaderboards(instance, **kwargs):
+    """Заполняет освободившиеся места в топах удалённого произведения."""
+    leaderboards.rebuild_title_scopes(instance)
+
+
+@receiver(post_delete, sender=Category)
+def drop_category_leaderboard(instance, **kwargs):
+    """Удаляет топ удалённой категории."""
+    leaderboards.drop_scope(LeaderboardEntry.CATEGORY, instance.pk)
+
+
+@receiver(post_delete, sender=Genre)
+def drop_genre_leaderboard(instance, **kwargs):
+    """Удаляет топ удалённого жанра."""
+    leaderboards.drop_scope(LeaderboardEntry.GENRE, instance.pk)
+
+
+# Модель -> тип объекта в отметках об удалении.
+TOMBSTONE_KINDS = {
+    Title: Tombstone.TITLE,
+    Review: Tombstone.REVIEW,
+    Comment: Tombstone.COMMENT,
+}
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def record_tombstone(sender, instance, **kwargs):
+    """
+    Отмечает удаление для ленты изменений.
+
+    Срабатывает и при каскадном удалении отзывов и комментариев
+    произведения, так что клиенту не нужно выводить каскад самому.
+    """
+    Tombstone.objects.create(
+        kind=TOMBSTONE_KINDS[sender], object_id=instance.pk
+    )
+
+
+def touch_titles(queryset):
+    """Отмечает изменение произведений, чьё представление поменялось."""
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def touch_category_titles(instance, created, raw=False, **kwargs):
+    """Изменение категории меняет представление её произведений."""
+    if not raw and not created:
+        touch_titles(Title.objects.filter(category_id=instance.pk))
+
+
+@receiver(post_save, sender=Genre)
+def touch_genre_titles(instance, created, raw=False, **kwargs):
+    """Изменение жанра меняет представление его произведений."""
+    if not raw and not created:
+        touch_titles(Title.objects.filter(genre=instance.pk))
+
+
+@receiver(pre_delete, sender=Category)
+def touch_orphaned_category_titles(instance, **kwargs):
+    """Произведения удаляемой категории остаются без категории."""
+    touch_titles(Title.objects.filter(category_id=instance.pk))
+
+
+@receiver(pre_delete, sender=Genre)
+def touch_orphaned_genre_titles(instance, **kwargs):
+    """Связи с удаляемым жанром удаляются каскадом без m2m_changed."""
+    touch_titles(Title.objects.filter(genre=instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_regenred_titles(instance, action, reverse, pk_set, **kwargs):
+    """Отмечает изменение произведений при изменении связей с жанрами."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch_titles(Title.objects.filter(pk=instance.pk))
+        return
+    if action == 'pre_clear':
+        touch_titles(Title.objects.filter(genre=instance.pk))
+    elif action in ('post_add', 'post_remove'):
+        touch_titles(Title.objects.filter(pk__in=pk_set))
+
+
+@receiver((post_save, post_delete), sender=Title)
+def invalidate_title_responses(instance, **kwargs):
+    """Сброс кэша ответов произведения."""
+    cache_versions.title_changed(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Review)
+def invalidate_reviewed_title_responses(instance, **kwargs):
+    """
+    Отзыв меняет рейтинг произведения и топы.
+
+    Общая таблица рейтингов обновляется до смены версий кэша: иначе
+    запрос между ними закэшировал бы старый рейтинг под новой версией.
+    """
+    rating_table.title_changed(instance.title_id)
+    cache_versions.title_changed(instance.title_id)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_regenred_title_responses(instance, action, reverse,
+                                        **kwargs):
+    """Сброс кэша ответов при изменении жанров произведений."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        cache_versions.catalog_changed()
+    else:
+        cache_versions.title_changed(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_catalog_responses(**kwargs):
+    """Категории и жанры входят в ответы всех произведений и топов."""
+    cache_versions.catalog_changed()
+
+
+@receiver(post_migrate)
+def invalidate_all_responses(**kwargs):
+    """Сброс кэша ответов после migrate и flush."""
+    cache_versions.bump(
+        cache_versions.TITLE_LISTS,
+        cache_versions.TITLE_DETAILS,
+        cache_versions.LEADERBOARDS,
+    )
+
+
+@receiver(post_migrate)
+def reset_rating_table(sender, **kwargs):
+    """
+    Стирает общую таблицу после migrate и flush.
+
+    Иначе после сброса базы произведения с теми же id получали бы
+    рейтинги прежней базы.
+    """
+    if sender.label == 'reviews':
+        rating_table.clear_table()
+
+
+@receiver(post_delete, sender=Title)
+def clear_rating_table(instance, **kwargs):
+    """Обнуляет запись удалённого произведения в общей таблице."""
+    rating_table.title_deleted(instance.pk)
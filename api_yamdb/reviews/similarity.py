@@ -0,0 +1,89 @@
+from itertools import chain
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+
+def normalize_rows(matrix):
+    """Разреженная матрица с единичной L2-нормой ненулевых строк."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def read_links(queryset, chunk_size=10000):
+    """
+    Пары (id произведения, id признака) из values_list() в массив N x 2.
+
+    Строки читаются курсором БД порциями и сразу складываются в массив
+    int64, без промежуточного списка кортежей всех пар.
+    """
+    return np.fromiter(
+        chain.from_iterable(queryset.iterator(chunk_size=chunk_size)),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+
+def link_matrix(row_ids, links, size):
+    """
+    Бинарная матрица связей произведение x признак с нормой строк 1.
+
+    `row_ids` — отсортированные id произведений, `links` — пары
+    (id произведения, id признака): жанра или автора отзыва.
+    """
+    links = np.asarray(links, dtype=np.int64).reshape(-1, 2)
+    rows = np.searchsorted(row_ids, links[:, 0])
+    features, columns = np.unique(links[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(links), dtype=np.float32), (rows, columns.ravel())),
+        shape=(size, len(features)),
+    )
+    matrix.data[:] = 1
+    return normalize_rows(matrix)
+
+
+def title_vectors(title_ids, genre_links, review_links, genre_weight,
+                  review_weight):
+    """
+    Векторы произведений из жанров и авторов отзывов.
+
+    Блоки жанров и авторов нормируются отдельно и складываются с весами,
+    поэтому скалярное произведение нормированных векторов — взвешенное
+    косинусное сходство по обоим признакам.
+    """
+    size = len(title_ids)
+    blocks = [
+        genre_weight * link_matrix(title_ids, genre_links, size),
+        review_weight * link_matrix(title_ids, review_links, size),
+    ]
+    return normalize_rows(sparse.hstack(blocks).tocsr()).astype(np.float32)
+
+
+def top_neighbours(vectors, count, chunk_size):
+    """
+    Ближайшие соседи каждой строки по косинусному сходству.
+
+    Сходство считается блоками по `chunk_size` строк, так что в памяти
+    держится не больше chunk_size x N плотных значений. Выдаёт тройки
+    (номер строки, номера соседей, сходства) по убыванию сходства, соседи
+    с нулевым сходством отбрасываются.
+    """
+    size = vectors.shape[0]
+    count = min(count, size - 1)
+    if count <= 0:
+        return
+    transposed = vectors.T.tocsc()
+    for start in range(0, size, chunk_size):
+        block = (vectors[start:start + chunk_size] @ transposed).toarray()
+        rows = np.arange(block.shape[0])
+        block[rows, start + rows] = 0
+        top = np.argpartition(-block, count - 1, axis=1)[:, :count]
+        scores = np.take_along_axis(block, top, axis=1)
+        for row in rows:
+            order = np.lexsort((top[row], -scores[row]))
+            neighbours, similarity = top[row][order], scores[row][order]
+            positive = similarity > 0
+            yield start + row, neighbours[positive], similarity[positive]
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08PaginationAPI:
+
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_countless_pagination(self, admin_client, client):
+        create_genre(admin_client)
+        for idx in range(3):
+            admin_client.post(
+                self.GENRES_URL,
+                data={'name': f'Жанр {idx}', 'slug': f'genre-{idx}'}
+            )
+        response = client.get(self.GENRES_URL, {'count': 'false'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            f'Проверьте, что GET-запрос к `{self.GENRES_URL}` с параметром '
+            '`count=false` не возвращает ключ `count`.'
+        )
+        assert len(data['results']) == 5
+        assert data['next'] is not None, (
+            'Проверьте, что при отключённом подсчёте количества ссылка на '
+            'следующую страницу формируется корректно.'
+        )
+        assert data['previous'] is None
+
+        response = client.get(data['next'])
+        data = response.json()
+        assert len(data['results']) == 1
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+    def test_02_countless_pagination_invalid_page(self, admin_client, client):
+        create_genre(admin_client)
+        response = client.get(
+            self.GENRES_URL, {'count': 'false', 'page': 10}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос несуществующей страницы с параметром '
+            '`count=false` возвращает ответ со статусом 404.'
+        )
+
+    def test_03_approximate_count(self, admin_client, client):
+        create_genre(admin_client)
+        response = client.get(self.GENRES_URL, {'count': 'approx'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 3, (
+            f'Проверьте, что GET-запрос к `{self.GENRES_URL}` с параметром '
+            '`count=approx` возвращает количество объектов.'
+        )
+        assert len(data['results']) == 3
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09SparseFieldsAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_titles_fields(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, {'fields': 'id,name,rating'})
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с '
+                'параметром `fields` возвращает только запрошенные поля.'
+            )
+
+    def test_02_titles_omit(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'omit': 'description,genre'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'description' not in data and 'genre' not in data, (
+            'Проверьте, что параметр `omit` исключает поля из ответа.'
+        )
+        assert data['name'] == titles[0]['name']
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+
+    def test_03_reviews_fields(self, admin_client, user_client, user,
+                               moderator_client, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        reviews, titles = create_reviews(admin_client, authors_map)
+        response = user_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'fields': 'id,author'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert {(item['id'], item['author']) for item in results} == {
+            (review['id'], review['author']) for review in reviews
+        }
+        for item in results:
+            assert set(item) == {'id', 'author'}
+
+    def test_04_users_fields(self, admin_client, admin):
+        response = admin_client.get(self.USERS_URL, {'fields': 'username'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [{'username': admin.username}]
@@ -0,0 +1,50 @@
+import datetime
+import decimal
+import io
+
+import pytest
+from django.utils import timezone
+from django.utils.functional import lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+lazy_str = lazy(lambda: 'ленивая строка', str)
+
+RENDER_CASES = (
+    None,
+    [],
+    {'count': 2, 'next': None, 'results': [{'id': 1, 'name': 'Фильм'}]},
+    {'pub_date': datetime.datetime(2024, 10, 14, 10, 30, 1, 123456,
+                                   tzinfo=timezone.utc)},
+    {'naive': datetime.datetime(2024, 10, 14, 10, 30)},
+    {'date': datetime.date(2024, 10, 14), 'time': datetime.time(10, 30)},
+    {'price': decimal.Decimal('9.50'), 'rating': 7.25},
+    {'lazy': lazy_str(), 1: 'int key'},
+    {'text': 'строка с разделителями '},
+)
+
+
+@pytest.mark.parametrize('data', RENDER_CASES)
+def test_fast_renderer_matches_json_renderer(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data), (
+        'Проверьте, что FastJSONRenderer формирует тот же JSON, что и '
+        'JSONRenderer.'
+    )
+
+
+def test_fast_renderer_indent_fallback():
+    data = {'name': 'Фильм', 'slug': 'films'}
+    media_type = 'application/json; indent=4'
+    assert FastJSONRenderer().render(data, media_type) == (
+        JSONRenderer().render(data, media_type)
+    )
+
+
+def test_fast_parser_matches_json_parser():
+    body = '{"name": "Фильм", "year": 1984, "genre": ["drama"]}'.encode()
+    assert FastJSONParser().parse(io.BytesIO(body)) == (
+        JSONParser().parse(io.BytesIO(body))
+    )
@@ -0,0 +1,76 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CompressionAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_gzip_compression(self, admin_client, client, settings):
+        settings.COMPRESSION_MIN_LENGTH = 100
+        create_titles(admin_client)
+        plain = client.get(self.TITLES_URL)
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответы длиннее порога сжимаются, если клиент '
+            'передал `Accept-Encoding: gzip`.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert not plain.has_header('Content-Encoding')
+
+    def test_02_small_response_not_compressed(self, client, settings):
+        settings.COMPRESSION_MIN_LENGTH = 100000
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы короче порога не сжимаются.'
+        )
+
+    def test_03_rejected_encoding(self, admin_client, client, settings):
+        settings.COMPRESSION_MIN_LENGTH = 100
+        create_titles(admin_client)
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip;q=0, identity'
+        )
+        assert not response.has_header('Content-Encoding')
+
+    def test_04_quality_order(self, admin_client, client, settings):
+        settings.COMPRESSION_MIN_LENGTH = 100
+        create_titles(admin_client)
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='br;q=0.1, gzip;q=0.9'
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что выбирается кодировка с наибольшим весом q.'
+        )
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip;q=0.5, identity'
+        )
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответ не сжимается, если клиент предпочитает '
+            'identity.'
+        )
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='*;q=0.3'
+        )
+        assert response.has_header('Content-Encoding')
+
+    def test_05_large_response_not_compressed(self, admin_client, client,
+                                              settings):
+        settings.COMPRESSION_MIN_LENGTH = 100
+        create_titles(admin_client)
+        plain = client.get(self.TITLES_URL)
+        settings.COMPRESSION_MAX_LENGTH = len(plain.content) - 1
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы длиннее COMPRESSION_MAX_LENGTH '
+            'отдаются без сжатия.'
+        )
+        assert response.content == plain.content
@@ -0,0 +1,28 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12MiddlewareAPI:
+
+    GENRES_URL = '/api/v1/genres/'
+    ADMIN_LOGIN_URL = '/admin/login/'
+
+    def test_01_api_skips_browser_middleware(self, client):
+        response = client.get(self.GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('X-Frame-Options'), (
+            'Проверьте, что для запросов к API не выполняется '
+            'XFrameOptionsMiddleware.'
+        )
+        assert not hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что для запросов к API не загружается сессия.'
+        )
+
+    def test_02_admin_keeps_full_stack(self, client):
+        response = client.get(self.ADMIN_LOGIN_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('X-Frame-Options')
+        assert hasattr(response.wsgi_request, 'session')
+        assert 'csrftoken' in response.cookies
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre
+from reviews.reference import genre_cache
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ReferenceCache:
+
+    def test_01_lookup_without_queries(self):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        genre_cache.get('drama')
+        with CaptureQueriesContext(connection) as queries:
+            instance = genre_cache.get_instance('drama')
+            missing = genre_cache.get_instance('missing')
+        assert len(queries) == 0, (
+            'Проверьте, что поиск жанра по slug после загрузки кэша не '
+            'выполняет запросов к БД.'
+        )
+        assert instance.pk == genre.pk and instance.name == genre.name
+        assert missing is None
+
+    def test_02_invalidation_on_change(self):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        assert genre_cache.get('drama') == (genre.pk, 'Драма')
+        genre.name = 'Трагедия'
+        genre.save()
+        assert genre_cache.get('drama') == (genre.pk, 'Трагедия'), (
+            'Проверьте, что кэш жанров сбрасывается при сохранении жанра.'
+        )
+        genre.delete()
+        assert genre_cache.get('drama') is None, (
+            'Проверьте, что кэш жанров сбрасывается при удалении жанра.'
+        )
+
+    def test_03_invalidation_after_commit(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        version = genre_cache.get_shared_version()
+        with transaction.atomic():
+            Genre.objects.create(name='Комедия', slug='comedy')
+            assert genre_cache.get_shared_version() == version, (
+                'Проверьте, что версия справочника меняется только после '
+                'фиксации транзакции.'
+            )
+        assert genre_cache.get_shared_version() != version
+        assert genre_cache.get('comedy') is not None
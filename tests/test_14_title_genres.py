@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleGenresAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_unknown_genre_error(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genres[0]['slug'], 'unknown', 'missing'],
+            'category': categories[0]['slug'],
+        }
+        response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['genre'] == [
+            'Object with slug=unknown does not exist.'
+        ], (
+            'Проверьте, что ошибка для неизвестного жанра не изменилась и '
+            'относится к первому неизвестному slug.'
+        )
+
+    def test_02_genre_lookup_without_genre_queries(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        admin_client.get('/api/v1/genres/')
+        data = {
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        genre_lookups = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_genre"' in query['sql']
+            and 'INNER JOIN' not in query['sql']
+        ]
+        assert not genre_lookups, (
+            'Проверьте, что жанры по slug не запрашиваются из БД поштучно.'
+        )
+        assert sorted(response.json()['genre']) == sorted(data['genre'])
+
+    def test_03_patch_genres_diff(self, admin_client, client):
+        titles, _, genres = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = admin_client.patch(
+            url, data={'genre': [genres[1]['slug'], genres[2]['slug']]}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = client.get(url).json()
+        assert sorted(genre['slug'] for genre in title['genre']) == sorted(
+            [genres[1]['slug'], genres[2]['slug']]
+        )
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15BulkAPI:
+
+    TITLES_BULK_URL = '/api/v1/titles/bulk/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_titles_bulk_create(self, admin_client, client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[0]['slug'], genres[idx % 3]['slug']],
+                'category': categories[idx % 2]['slug'],
+            }
+            for idx in range(4)
+        ]
+        response = admin_client.post(
+            self.TITLES_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к '
+            f'`{self.TITLES_BULK_URL}` со списком корректных произведений '
+            'возвращает ответ со статусом 201.'
+        )
+        created = response.json()
+        assert [title['name'] for title in created] == [
+            item['name'] for item in data
+        ]
+        assert sorted(created[1]['genre']) == sorted(data[1]['genre'])
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == len(data)
+
+    def test_02_titles_bulk_create_errors(self, admin_client, client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': 'Корректное',
+                'year': 2000,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            },
+            {
+                'name': 'С ошибкой',
+                'year': 2000,
+                'genre': ['unknown'],
+                'category': categories[0]['slug'],
+            },
+        ]
+        response = admin_client.post(
+            self.TITLES_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {} and 'genre' in errors[1], (
+            'Проверьте, что ошибки массового создания возвращаются по '
+            'позициям элементов списка.'
+        )
+        assert client.get(self.TITLES_URL).json()['count'] == 0
+
+    def test_03_titles_bulk_create_permissions(self, user_client, client):
+        assert client.post(
+            self.TITLES_BULK_URL, data='[]', content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            self.TITLES_BULK_URL, data=[], format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_genres_bulk_create_and_delete(self, admin_client, client):
+        url = '/api/v1/genres/bulk/'
+        data = [
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Драма', 'slug': 'drama'},
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json() == data
+        assert client.get('/api/v1/genres/').json()['count'] == 3
+
+        response = admin_client.post(
+            url, data=[{'name': 'Ужасы', 'slug': 'horror'}], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что массовое создание не допускает существующих slug.'
+        )
+
+        response = admin_client.delete(f'{url}?slugs=horror,comedy,unknown')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 2, 'missing': ['unknown']}
+        assert client.get('/api/v1/genres/').json()['results'] == [data[2]]
+
+    def test_05_categories_bulk_delete_set_null(self, admin_client, client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        response = admin_client.post(self.TITLES_BULK_URL, data=[{
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        }], format='json')
+        title_id = response.json()[0]['id']
+        response = admin_client.delete(
+            '/api/v1/categories/bulk/?slugs='
+            f'{categories[0]["slug"]},{categories[1]["slug"]}'
+        )
+        assert response.json()['deleted'] == 2
+        title = client.get(f'{self.TITLES_URL}{title_id}/').json()
+        assert title['category'] is None, (
+            'Проверьте, что при массовом удалении категорий у произведений '
+            'обнуляется категория.'
+        )
+        response = admin_client.delete('/api/v1/categories/bulk/')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_bulk_size_checked_first(self, admin_client, settings):
+        settings.TITLES_BULK_MAX_SIZE = 1
+        settings.TAXONOMY_BULK_MAX_SIZE = 1
+        data = [{'name': 'Без года', 'genre': ['unknown']}] * 2
+        response = admin_client.post(
+            self.TITLES_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['non_field_errors'], (
+            'Проверьте, что слишком большой пакет отклоняется до проверки '
+            'отдельных произведений.'
+        )
+        response = admin_client.post(
+            '/api/v1/genres/bulk/', data=[{'slug': '!'}] * 2, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['non_field_errors']
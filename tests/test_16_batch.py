@@ -0,0 +1,37 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleBatchAPI:
+
+    TITLES_BATCH_URL = '/api/v1/titles/batch/'
+
+    def test_01_batch_keeps_order_and_reports_missing(self, admin_client,
+                                                      client):
+        titles, categories, _ = create_titles(admin_client)
+        missing_id = titles[0]['id'] + titles[1]['id'] + 100
+        ids = [titles[1]['id'], missing_id, titles[0]['id']]
+        response = client.get(
+            self.TITLES_BATCH_URL, {'ids': ','.join(map(str, ids))}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            'Проверьте, что произведения возвращаются в порядке id из '
+            'запроса.'
+        )
+        assert data['missing'] == [missing_id]
+        assert data['results'][1]['category'] == categories[0]
+        assert data['results'][1]['rating'] is None
+
+    def test_02_batch_invalid_ids(self, client):
+        response = client.get(self.TITLES_BATCH_URL, {'ids': '1,abc'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.TITLES_BATCH_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ExpandAPI:
+
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_title_expand_reviews_and_comments(self, admin_client, client,
+                                                  user_client, user,
+                                                  moderator_client,
+                                                  moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, {'expand': 'reviews.comments'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [review['id'] for review in data['reviews']] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что параметр `expand=reviews` встраивает отзывы '
+            'к произведению.'
+        )
+        assert [
+            (comment['id'], comment['author'], comment['text'])
+            for comment in data['reviews'][0]['comments']
+        ] == [
+            (comment['id'], comment['author'], comment['text'])
+            for comment in comments
+        ], (
+            'Проверьте, что параметр `expand=reviews.comments` встраивает '
+            'комментарии к каждому отзыву.'
+        )
+        assert data['reviews'][1]['comments'] == []
+        assert len(queries) == 4, (
+            'Проверьте, что развёрнутые отзывы и комментарии выбираются '
+            'одним запросом на уровень.'
+        )
+
+    def test_02_title_without_expand(self, admin_client, client, user_client,
+                                     user):
+        _, _, titles = create_comments(admin_client, {user: user_client})
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert 'reviews' not in response.json()
+
+    def test_03_reviews_expand_comments(self, admin_client, client,
+                                        user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'expand': 'comments'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert results[0]['id'] == reviews[0]['id']
+        assert [comment['id'] for comment in results[0]['comments']] == [
+            comment['id'] for comment in comments
+        ], (
+            'Проверьте, что параметр `expand=comments` встраивает '
+            'комментарии в список отзывов.'
+        )
+
+    def test_04_expand_is_limited_to_first_page(self, admin_client, client,
+                                                user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        for idx in range(6):
+            user_client.post(url, data={'text': f'extra {idx}'})
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'expand': 'comments'}
+        )
+        embedded = response.json()['results'][0]['comments']
+        assert len(embedded) == 5, (
+            'Проверьте, что встраивается только первая страница '
+            'комментариев.'
+        )
+        assert embedded[0]['id'] == comments[0]['id']
+
+    def test_05_expand_respects_sparse_fields(self, admin_client, client,
+                                              user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url, {'fields': 'id', 'expand': 'reviews'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'id': titles[0]['id']}, (
+            'Проверьте, что связь, не указанная в `fields`, не '
+            'разворачивается.'
+        )
+        response = client.get(url, {'omit': 'reviews', 'expand': 'reviews'})
+        assert 'reviews' not in response.json()
+        response = client.get(
+            url, {'fields': 'id,reviews', 'expand': 'reviews'}
+        )
+        data = response.json()
+        assert set(data) == {'id', 'reviews'}, (
+            'Проверьте, что развёрнутую связь можно выбрать в `fields`.'
+        )
+        assert [review['id'] for review in data['reviews']] == [
+            review['id'] for review in reviews
+        ]
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'fields': 'id', 'expand': 'comments'}
+        )
+        assert set(response.json()['results'][0]) == {'id'}
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18CommentCountersAPI:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def get_reviews(self, client, title_id):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return {
+            review['id']: review for review in response.json()['results']
+        }
+
+    def test_01_counters_follow_create_and_delete(self, admin_client,
+                                                  client, user_client, user,
+                                                  moderator_client,
+                                                  moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        data = self.get_reviews(client, title_id)
+        assert data[review_id]['comment_count'] == len(comments), (
+            'Проверьте, что в отзыве выводится число комментариев.'
+        )
+        last_comment = client.get(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id,
+                comment_id=comments[-1]['id']
+            )
+        ).json()
+        assert data[review_id]['last_comment_at'] == (
+            last_comment['pub_date']
+        ), (
+            'Проверьте, что в отзыве выводится дата последнего комментария.'
+        )
+        assert data[reviews[1]['id']]['comment_count'] == 0
+        assert data[reviews[1]['id']]['last_comment_at'] is None
+
+        response = moderator_client.delete(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id,
+                comment_id=comments[-1]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        detail = client.get(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            )
+        ).json()
+        assert detail['comment_count'] == len(comments) - 1, (
+            'Проверьте, что при удалении комментария счётчик уменьшается.'
+        )
+        assert detail['last_comment_at'] < last_comment['pub_date']
+
+    def test_02_recount_command(self, admin_client, client, user_client,
+                                user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        Review.objects.update(comment_count=0, last_comment_at=None)
+        call_command('rebuild_counters', 'reviews')
+        data = self.get_reviews(client, titles[0]['id'])
+        assert data[reviews[0]['id']]['comment_count'] == len(comments), (
+            'Проверьте, что команда rebuild_counters пересчитывает '
+            'счётчики комментариев.'
+        )
+        assert data[reviews[0]['id']]['last_comment_at'] is not None
+
+    def test_03_counters_follow_cascade(self, admin_client, client,
+                                        user_client, user, moderator_client,
+                                        moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        response = admin_client.delete(
+            f'/api/v1/users/{moderator.username}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        detail = client.get(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+        ).json()
+        assert detail['comment_count'] == len(comments) - 1, (
+            'Проверьте, что счётчик комментариев уменьшается при каскадном '
+            'удалении комментариев вместе с автором.'
+        )
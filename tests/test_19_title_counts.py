@@ -0,0 +1,105 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Genre
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleCountsAPI:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+    TITLES_BULK_URL = '/api/v1/titles/bulk/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def get_counts(self, client, url):
+        response = client.get(url, {'fields': 'slug,title_count'})
+        assert response.status_code == HTTPStatus.OK
+        return {
+            item['slug']: item['title_count']
+            for item in response.json()['results']
+        }
+
+    def test_01_title_count_is_opt_in(self, admin_client, client):
+        create_titles(admin_client)
+        for url in (self.CATEGORIES_URL, self.GENRES_URL):
+            response = client.get(url)
+            for item in response.json()['results']:
+                assert set(item) == {'name', 'slug'}, (
+                    f'Проверьте, что GET-запрос к `{url}` без параметра '
+                    '`fields` не выводит `title_count`.'
+                )
+
+    def test_02_counts_follow_title_changes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.get_counts(client, self.CATEGORIES_URL) == {
+            'films': 1, 'books': 1
+        }, 'Проверьте, что у категорий выводится число произведений.'
+        assert self.get_counts(client, self.GENRES_URL) == {
+            'horror': 1, 'comedy': 1, 'drama': 1
+        }, 'Проверьте, что у жанров выводится число произведений.'
+
+        response = admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data=json.dumps({'category': 'books', 'genre': ['drama']}),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_counts(client, self.CATEGORIES_URL) == {
+            'films': 0, 'books': 2
+        }, (
+            'Проверьте, что при смене категории произведения счётчики '
+            'категорий обновляются.'
+        )
+        assert self.get_counts(client, self.GENRES_URL) == {
+            'horror': 0, 'comedy': 0, 'drama': 2
+        }, (
+            'Проверьте, что при смене жанров произведения счётчики жанров '
+            'обновляются.'
+        )
+
+        response = admin_client.delete(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_counts(client, self.CATEGORIES_URL)['books'] == 1
+        assert self.get_counts(client, self.GENRES_URL)['drama'] == 1
+
+    def test_03_counts_follow_bulk_create(self, admin_client, client):
+        create_titles(admin_client)
+        response = admin_client.post(
+            self.TITLES_BULK_URL,
+            data=json.dumps([
+                {'name': 'Чужой', 'year': 1979, 'category': 'films',
+                 'genre': ['horror', 'drama']},
+                {'name': 'Оно', 'year': 1986, 'category': 'books',
+                 'genre': ['horror']},
+            ]),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert self.get_counts(client, self.CATEGORIES_URL) == {
+            'films': 2, 'books': 2
+        }
+        assert self.get_counts(client, self.GENRES_URL) == {
+            'horror': 3, 'comedy': 1, 'drama': 2
+        }
+
+    def test_04_recount_command(self, admin_client, client):
+        create_titles(admin_client)
+        Category.objects.update(title_count=0)
+        Genre.objects.update(title_count=5)
+        call_command('rebuild_counters', 'categories', 'genres')
+        assert self.get_counts(client, self.CATEGORIES_URL) == {
+            'films': 1, 'books': 1
+        }, (
+            'Проверьте, что команда rebuild_counters пересчитывает число '
+            'произведений у категорий.'
+        )
+        assert self.get_counts(client, self.GENRES_URL) == {
+            'horror': 1, 'comedy': 1, 'drama': 1
+        }
@@ -0,0 +1,123 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+
+from reviews.models import Category, Review, Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20RebuildCounters:
+
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, admin_client, client,
+                                              user_client, user,
+                                              moderator_client, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        reviews, titles = create_reviews(admin_client, authors_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data=json.dumps({'score': 9}),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения учитывает изменение '
+            'оценки в отзыве.'
+        )
+        response = moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения учитывает удаление отзыва.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None
+
+    def test_02_dry_run_reports_without_writing(self, admin_client,
+                                                user_client, user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        Title.objects.filter(pk=titles[0]['id']).update(
+            score_sum=0, score_count=0
+        )
+        out = StringIO()
+        call_command('rebuild_counters', 'titles', '--dry-run', stdout=out)
+        assert f'id: {titles[0]["id"]}' in out.getvalue(), (
+            'Проверьте, что команда rebuild_counters с --dry-run выводит '
+            'расходящиеся объекты.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count) == (0, 0), (
+            'Проверьте, что команда rebuild_counters с --dry-run ничего '
+            'не записывает.'
+        )
+
+    def test_03_rebuild_in_chunks(self, admin_client, client, user_client,
+                                  user, moderator_client, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        _, titles = create_reviews(admin_client, authors_map)
+        Title.objects.update(score_sum=100, score_count=1)
+        Review.objects.update(comment_count=3)
+        Category.objects.update(title_count=0)
+        out = StringIO()
+        call_command('rebuild_counters', '--chunk-size', '1', stdout=out)
+        assert self.get_rating(client, titles[0]['id']) == 5, (
+            'Проверьте, что команда rebuild_counters пересчитывает сумму и '
+            'число оценок произведений.'
+        )
+        assert set(
+            Review.objects.values_list('comment_count', flat=True)
+        ) == {0}
+        assert set(
+            Category.objects.values_list('title_count', flat=True)
+        ) == {1}
+        out = StringIO()
+        call_command('rebuild_counters', '--dry-run', stdout=out)
+        assert out.getvalue().count('расхождений нет') == 4
+
+    def test_04_rating_follows_cascade(self, admin_client, client,
+                                       user_client, user, moderator_client,
+                                       moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        _, titles = create_reviews(admin_client, authors_map)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        assert self.get_rating(client, titles[0]['id']) is None, (
+            'Проверьте, что рейтинг произведения учитывает каскадное '
+            'удаление отзывов вместе с автором.'
+        )
+
+    def test_05_load_data_counters(self, client):
+        call_command('load_data', stdout=StringIO())
+        expected = {
+            pk: int(average) for pk, average in Title.objects.annotate(
+                average=Avg('reviews__score')
+            ).filter(average__isnull=False).values_list('pk', 'average')
+        }
+        for title_id in list(expected)[:3]:
+            assert self.get_rating(client, title_id) == expected[title_id], (
+                'Проверьте, что после load_data рейтинг произведений '
+                'совпадает со средней оценкой отзывов.'
+            )
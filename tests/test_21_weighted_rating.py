@@ -0,0 +1,84 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21WeightedRating:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_catalog(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        titles = {}
+        for name, category, score_sum, score_count in (
+            ('single', films, 10, 1),
+            ('popular', films, 180, 20),
+            ('poor', films, 20, 4),
+            ('unrated', books, 0, 0),
+            ('orphan', None, 6, 2),
+        ):
+            titles[name] = Title.objects.create(
+                name=name, year=2000, category=category,
+                score_sum=score_sum, score_count=score_count
+            )
+        return titles
+
+    def get_ratings(self, titles):
+        return {
+            name: Title.objects.get(pk=title.pk).weighted_rating
+            for name, title in titles.items()
+        }
+
+    def test_01_category_prior(self, client):
+        titles = self.create_catalog()
+        call_command(
+            'update_weighted_ratings', '--prior-weight', '10',
+            stdout=StringIO()
+        )
+        ratings = self.get_ratings(titles)
+        films_mean = 210 / 25
+        global_mean = 216 / 27
+        assert ratings['single'] == round((10 * films_mean + 10) / 11, 2), (
+            'Проверьте, что взвешенный рейтинг считается с априорным '
+            'средним по категории.'
+        )
+        assert ratings['popular'] == round((10 * films_mean + 180) / 30, 2)
+        assert ratings['unrated'] is None
+        assert ratings['orphan'] == round((10 * global_mean + 6) / 12, 2), (
+            'Проверьте, что для произведений без категории используется '
+            'среднее по каталогу.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'ordering': '-weighted_rating', 'count': 'false'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        names = [title['name'] for title in response.json()['results']]
+        assert names.index('popular') < names.index('single'), (
+            'Проверьте, что произведения можно упорядочить по взвешенному '
+            'рейтингу.'
+        )
+
+    def test_02_global_prior_and_unchanged_rerun(self):
+        titles = self.create_catalog()
+        call_command(
+            'update_weighted_ratings', '--prior', 'global',
+            '--prior-weight', '10', stdout=StringIO()
+        )
+        ratings = self.get_ratings(titles)
+        global_mean = 216 / 27
+        assert ratings['single'] == round((10 * global_mean + 10) / 11, 2)
+        out = StringIO()
+        call_command(
+            'update_weighted_ratings', '--prior', 'global',
+            '--prior-weight', '10', stdout=out
+        )
+        assert 'обновлено: 0' in out.getvalue(), (
+            'Проверьте, что повторный запуск не перезаписывает неизменённые '
+            'рейтинги.'
+        )
@@ -0,0 +1,135 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db.models import QuerySet
+
+from reviews import counters
+from reviews.models import TitleScoreHistogram
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ScoreHistogramAPI:
+
+    HISTOGRAM_URL_TEMPLATE = '/api/v1/titles/{title_id}/histogram/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_histogram(self, client, title_id):
+        response = client.get(
+            self.HISTOGRAM_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/{title_id}/'
+            'histogram/` возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_histogram_follows_reviews(self, admin_client, client,
+                                          user_client, user,
+                                          moderator_client, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        reviews, titles = create_reviews(admin_client, authors_map)
+        title_id = titles[0]['id']
+        data = self.get_histogram(client, title_id)
+        assert data['count'] == 2
+        assert data['histogram']['5'] == 2, (
+            'Проверьте, что распределение оценок учитывает новые отзывы.'
+        )
+        assert set(data['histogram']) == {str(i) for i in range(1, 11)}
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data=json.dumps({'score': 8}),
+            content_type='application/json'
+        )
+        moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            )
+        )
+        data = self.get_histogram(client, title_id)
+        assert data['count'] == 1
+        assert data['histogram']['5'] == 0
+        assert data['histogram']['8'] == 1, (
+            'Проверьте, что распределение оценок учитывает изменение и '
+            'удаление отзывов.'
+        )
+
+    def test_02_empty_and_missing_title(self, admin_client, client):
+        _, titles = create_reviews(admin_client, {})
+        data = self.get_histogram(client, titles[1]['id'])
+        assert data['count'] == 0
+        response = client.get(
+            self.HISTOGRAM_URL_TEMPLATE.format(title_id=titles[1]['id'] + 100)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(
+            self.HISTOGRAM_URL_TEMPLATE.format(title_id='abc')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что распределение по нечисловому id возвращает 404.'
+        )
+
+    def test_03_rebuild_command(self, admin_client, client, user_client,
+                                user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        TitleScoreHistogram.objects.all().delete()
+        call_command('rebuild_histograms', stdout=StringIO())
+        data = self.get_histogram(client, titles[0]['id'])
+        assert data['histogram']['5'] == 1, (
+            'Проверьте, что команда rebuild_histograms пересобирает '
+            'распределения оценок.'
+        )
+
+    def test_04_histogram_follows_cascade(self, admin_client, client,
+                                          user_client, user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        data = self.get_histogram(client, titles[0]['id'])
+        assert data['count'] == 0, (
+            'Проверьте, что распределение оценок учитывает каскадное '
+            'удаление отзывов вместе с автором.'
+        )
+
+    def test_05_concurrent_first_review(self, admin_client, user_client,
+                                        user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        title_id = titles[0]['id']
+        TitleScoreHistogram.objects.all().delete()
+        counters.change_histogram(title_id, {5: 1})
+        # Строку уже вставил параллельный первый отзыв, UPDATE её не видел.
+        update = QuerySet.update
+        misses = [0]
+
+        def update_missing_once(queryset, **kwargs):
+            if misses:
+                return misses.pop()
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update_missing_once):
+            counters.change_histogram(title_id, {7: 1})
+        histogram = TitleScoreHistogram.objects.get(title_id=title_id)
+        assert (histogram.score_5, histogram.score_7) == (1, 1), (
+            'Проверьте, что повторная вставка распределения оценок '
+            'применяет приращение, а не нарушает уникальность.'
+        )
+
+    def test_06_title_delete_drops_histogram(self, admin_client,
+                                             user_client, user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что удаление произведения с отзывами не создаёт '
+            'заново его распределение оценок.'
+        )
+        assert not TitleScoreHistogram.objects.filter(
+            title_id=titles[0]['id']
+        ).exists()
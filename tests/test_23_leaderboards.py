@@ -0,0 +1,152 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews import leaderboards
+from reviews.models import LeaderboardEntry
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23LeaderboardsAPI:
+
+    CATEGORY_TOP_URL_TEMPLATE = '/api/v1/categories/{slug}/top/'
+    GENRE_TOP_URL_TEMPLATE = '/api/v1/genres/{slug}/top/'
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def create_title(self, admin_client, name):
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': name, 'year': 2000, 'genre': ['horror'],
+            'category': 'films'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        return response.json()['id']
+
+    def get_top(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [(item['id'], item['rating']) for item in
+                response.json()['results']]
+
+    def test_01_incremental_updates(self, admin_client, client, user_client,
+                                    moderator_client, settings):
+        settings.LEADERBOARD_SIZE = 2
+        titles, _, _ = create_titles(admin_client)
+        first = titles[0]['id']
+        third = self.create_title(admin_client, 'Третий')
+        films_url = self.CATEGORY_TOP_URL_TEMPLATE.format(slug='films')
+        create_single_review(user_client, first, 'so-so', 5)
+        create_single_review(user_client, third, 'good', 8)
+        create_single_review(moderator_client, third, 'fine', 6)
+        assert self.get_top(client, films_url) == [(third, 7), (first, 5)], (
+            'Проверьте, что топ категории упорядочен по средней оценке.'
+        )
+
+        fourth = self.create_title(admin_client, 'Четвёртый')
+        create_single_review(user_client, fourth, 'great', 9)
+        assert self.get_top(client, films_url) == [(fourth, 9), (third, 7)], (
+            'Проверьте, что новое лучшее произведение вытесняет последнее '
+            'место в заполненном топе.'
+        )
+
+        create_single_review(moderator_client, fourth, 'awful', 1)
+        assert self.get_top(client, films_url) == [(third, 7), (first, 5)], (
+            'Проверьте, что топ пересобирается, если участник опустился '
+            'ниже произведений за его пределами.'
+        )
+
+        admin_client.delete(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=third)
+        )
+        assert self.get_top(client, films_url) == [(first, 5), (fourth, 5)]
+        assert self.get_top(
+            client, self.GENRE_TOP_URL_TEMPLATE.format(slug='horror')
+        ) == [(first, 5), (fourth, 5)]
+
+        admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=first),
+            data=json.dumps({'category': 'books', 'genre': ['drama']}),
+            content_type='application/json'
+        )
+        assert self.get_top(client, films_url) == [(fourth, 5)], (
+            'Проверьте, что при смене категории произведение переходит в '
+            'топ новой категории.'
+        )
+        assert self.get_top(
+            client, self.CATEGORY_TOP_URL_TEMPLATE.format(slug='books')
+        ) == [(first, 5)]
+        assert self.get_top(
+            client, self.GENRE_TOP_URL_TEMPLATE.format(slug='drama')
+        ) == [(first, 5)]
+
+    def test_02_limit_and_missing_scope(self, admin_client, client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        second = self.create_title(admin_client, 'Второй')
+        create_single_review(user_client, titles[0]['id'], 'ok', 6)
+        create_single_review(user_client, second, 'ok', 4)
+        response = client.get(
+            self.GENRE_TOP_URL_TEMPLATE.format(slug='horror'), {'limit': 1}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [{
+            'position': 1, 'id': titles[0]['id'],
+            'name': titles[0]['name'], 'year': titles[0]['year'],
+            'rating': 6,
+        }]
+        response = client.get(
+            self.GENRE_TOP_URL_TEMPLATE.format(slug='horror'), {'limit': 0}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(
+            self.CATEGORY_TOP_URL_TEMPLATE.format(slug='unknown')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_rebuild_command(self, admin_client, client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'ok', 6)
+        LeaderboardEntry.objects.all().delete()
+        call_command('rebuild_leaderboards', stdout=StringIO())
+        assert self.get_top(
+            client, self.CATEGORY_TOP_URL_TEMPLATE.format(slug='films')
+        ) == [(titles[0]['id'], 6)], (
+            'Проверьте, что команда rebuild_leaderboards пересобирает топы.'
+        )
+
+    def test_04_cascade_delete(self, admin_client, client, user_client, user,
+                               moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, first, 'great', 9)
+        create_single_review(moderator_client, second, 'ok', 6)
+        films_url = self.CATEGORY_TOP_URL_TEMPLATE.format(slug='films')
+        assert self.get_top(client, films_url)[0] == (first, 9)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert first not in dict(self.get_top(client, films_url)), (
+            'Проверьте, что произведение выбывает из топа при каскадном '
+            'удалении его отзывов вместе с автором.'
+        )
+
+    def test_05_concurrent_first_place(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'ok', 6)
+        entry = LeaderboardEntry.objects.filter(
+            title_id=title_id, scope_type=LeaderboardEntry.CATEGORY
+        ).get()
+        scope = (entry.scope_type, entry.scope_id)
+        # Место уже вставлено параллельным запросом, которого этот не видел.
+        leaderboards.place_title(scope, title_id, 7.0, None, (1, 6.0))
+        entry.refresh_from_db()
+        assert entry.rating == 7.0, (
+            'Проверьте, что повторная вставка места в топе обновляет его, '
+            'а не нарушает уникальность.'
+        )
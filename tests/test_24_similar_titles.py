@@ -0,0 +1,74 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SimilarTitlesAPI:
+
+    SIMILAR_URL_TEMPLATE = '/api/v1/titles/{title_id}/similar/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_title(self, admin_client, name, genre):
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': name, 'year': 2000, 'genre': genre, 'category': 'films'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        return response.json()['id']
+
+    def get_similar(self, client, title_id):
+        response = client.get(
+            self.SIMILAR_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/{title_id}/'
+            'similar/` возвращает ответ со статусом 200.'
+        )
+        return response.json()['results']
+
+    def test_01_similar_by_genres_and_reviews(self, admin_client, client,
+                                              user_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        twin = self.create_title(admin_client, 'Близнец', ['horror', 'comedy'])
+        lonely = self.create_title(admin_client, 'Одиночка', ['drama'])
+        assert self.get_similar(client, first) == []
+
+        create_single_review(user_client, first, 'ok', 7)
+        create_single_review(user_client, second, 'ok', 7)
+        call_command('build_similar_titles', '--chunk-size', '2',
+                     stdout=StringIO())
+
+        similar = self.get_similar(client, first)
+        assert [item['id'] for item in similar] == [twin, second], (
+            'Проверьте, что похожие произведения упорядочены по сходству '
+            'жанров и общих авторов отзывов.'
+        )
+        assert similar[0]['name'] == 'Близнец'
+        assert similar[0]['score'] > similar[1]['score'] > 0
+        assert [item['id'] for item in self.get_similar(client, lonely)] == [
+            second
+        ], (
+            'Проверьте, что произведения без общих жанров и авторов не '
+            'попадают в похожие.'
+        )
+
+    def test_02_count_and_missing_title(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        self.create_title(admin_client, 'Близнец', ['horror', 'comedy'])
+        self.create_title(admin_client, 'Ещё ужасы', ['horror'])
+        call_command('build_similar_titles', '--count', '1',
+                     stdout=StringIO())
+        assert len(self.get_similar(client, titles[0]['id'])) == 1
+        response = client.get(
+            self.SIMILAR_URL_TEMPLATE.format(title_id=titles[1]['id'] + 100)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(self.SIMILAR_URL_TEMPLATE.format(title_id='abc'))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что похожие по нечисловому id возвращают 404.'
+        )
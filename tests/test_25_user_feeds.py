@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25UserFeedsAPI:
+
+    MY_REVIEWS_URL = '/api/v1/users/me/reviews/'
+    MY_COMMENTS_URL = '/api/v1/users/me/comments/'
+
+    def create_activity(self, admin_client, user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews = [
+            create_single_review(
+                user_client, title['id'], f'review {idx}', 5 + idx
+            ).json()
+            for idx, title in enumerate(titles)
+        ]
+        create_single_review(moderator_client, titles[0]['id'], 'other', 1)
+        comments = [
+            create_single_comment(
+                user_client, titles[0]['id'], reviews[0]['id'], f'comment {i}'
+            ).json()
+            for i in range(3)
+        ]
+        return titles, reviews, comments
+
+    def test_01_unauthorized(self, client):
+        for url in (self.MY_REVIEWS_URL, self.MY_COMMENTS_URL):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что GET-запрос к `{url}` без токена возвращает '
+                'ответ со статусом 401.'
+            )
+
+    def test_02_my_reviews(self, admin_client, user_client,
+                           moderator_client):
+        titles, reviews, _ = self.create_activity(
+            admin_client, user_client, moderator_client
+        )
+        response = user_client.get(self.MY_REVIEWS_URL)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [item['id'] for item in results] == [
+            reviews[1]['id'], reviews[0]['id']
+        ], (
+            f'Проверьте, что `{self.MY_REVIEWS_URL}` возвращает только '
+            'отзывы пользователя, начиная с новых.'
+        )
+        assert results[1]['title'] == {
+            'id': titles[0]['id'],
+            'name': titles[0]['name'],
+            'year': titles[0]['year'],
+        }, 'Проверьте, что отзыв в ленте содержит данные произведения.'
+
+    def test_03_my_comments_cursor(self, admin_client, user_client,
+                                   moderator_client):
+        titles, reviews, comments = self.create_activity(
+            admin_client, user_client, moderator_client
+        )
+        seen = []
+        url = self.MY_COMMENTS_URL
+        params = {'page_size': 2}
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = user_client.get(url, params)
+            assert response.status_code == HTTPStatus.OK
+            assert len(queries) <= 2, (
+                'Проверьте, что отзыв и произведение комментария выбираются '
+                'через select_related.'
+            )
+            data = response.json()
+            assert 'count' not in data
+            seen.extend(data['results'])
+            url, params = data['next'], None
+        assert [item['id'] for item in seen] == [
+            comment['id'] for comment in reversed(comments)
+        ], (
+            f'Проверьте, что `{self.MY_COMMENTS_URL}` постранично отдаёт '
+            'комментарии пользователя, начиная с новых.'
+        )
+        assert seen[0]['review']['id'] == reviews[0]['id']
+        assert seen[0]['review']['title']['id'] == titles[0]['id']
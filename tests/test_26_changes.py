@@ -0,0 +1,166 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.pagination import decode_change_cursor, encode_change_cursor
+from reviews.models import Tombstone
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ChangesAPI:
+
+    CHANGES_URL = '/api/v1/changes/'
+
+    @pytest.fixture(autouse=True)
+    def no_settle_delay(self, settings):
+        settings.CHANGES_SETTLE_SECONDS = 0
+
+    def sync(self, client, cursor=None, limit=None):
+        changes = []
+        params = {}
+        if limit is not None:
+            params['limit'] = limit
+        while True:
+            if cursor is not None:
+                params['since'] = cursor
+            response = client.get(self.CHANGES_URL, params)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{self.CHANGES_URL}` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            changes.extend(data['changes'])
+            cursor = data['cursor']
+            if not data['has_more']:
+                return changes, cursor
+
+    @staticmethod
+    def summary(changes):
+        return [(item['type'], item['op'], item['id']) for item in changes]
+
+    def test_01_full_sync(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 7
+        ).json()
+        comment = create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'Комментарий'
+        ).json()
+        changes, cursor = self.sync(client, limit=2)
+        assert sorted(self.summary(changes)) == sorted([
+            ('title', 'upsert', titles[0]['id']),
+            ('title', 'upsert', titles[1]['id']),
+            ('review', 'upsert', review['id']),
+            ('comment', 'upsert', comment['id']),
+        ]), (
+            f'Проверьте, что `{self.CHANGES_URL}` без курсора постранично '
+            'отдаёт все произведения, отзывы и комментарии.'
+        )
+        by_type = {item['type']: item['data'] for item in changes}
+        assert by_type['review']['title']['id'] == titles[0]['id']
+        assert by_type['comment']['review']['id'] == review['id']
+        assert cursor is not None
+        assert self.sync(client, cursor)[0] == [], (
+            'Проверьте, что без новых изменений лента по курсору пуста.'
+        )
+
+    def test_02_incremental_changes(self, client, admin_client,
+                                    user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 7
+        ).json()
+        comment = create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'Комментарий'
+        ).json()
+        _, cursor = self.sync(client)
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        user_client.patch(url, data={'score': 3})
+        changes, cursor = self.sync(client, cursor)
+        assert sorted(self.summary(changes)) == [
+            ('review', 'upsert', review['id']),
+            ('title', 'upsert', titles[0]['id']),
+        ], (
+            'Проверьте, что изменение оценки попадает в ленту вместе с '
+            'изменившимся рейтингом произведения.'
+        )
+        title_data = next(
+            item['data'] for item in changes if item['type'] == 'title'
+        )
+        assert title_data['rating'] == 3
+
+        user_client.delete(f'{url}comments/{comment["id"]}/')
+        changes, cursor = self.sync(client, cursor)
+        assert ('comment', 'delete', comment['id']) in self.summary(
+            changes
+        ), 'Проверьте, что удаление комментария попадает в ленту.'
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        changes, cursor = self.sync(client, cursor)
+        assert sorted(self.summary(changes)) == [
+            ('review', 'delete', review['id']),
+            ('title', 'delete', titles[0]['id']),
+        ], (
+            'Проверьте, что удаление произведения отмечает удалёнными его '
+            'и его отзывы.'
+        )
+
+    def test_03_invalid_params(self, client):
+        for params in ({'since': 'not-a-cursor'}, {'limit': 0}):
+            response = client.get(self.CHANGES_URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{self.CHANGES_URL}` с некорректным '
+                'курсором или размером порции возвращает ответ со '
+                'статусом 400.'
+            )
+
+    def test_04_tombstone_retention(self, client, settings):
+        settings.CHANGES_TOMBSTONE_RETENTION_DAYS = 30
+        old = Tombstone.objects.create(
+            kind=Tombstone.TITLE, object_id=1,
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        fresh = Tombstone.objects.create(kind=Tombstone.TITLE, object_id=2)
+        call_command('prune_tombstones', stdout=StringIO())
+        assert list(Tombstone.objects.values_list('pk', flat=True)) == [
+            fresh.pk
+        ], (
+            'Проверьте, что prune_tombstones удаляет только отметки старше '
+            'срока хранения.'
+        )
+        response = client.get(self.CHANGES_URL, {
+            'since': encode_change_cursor((old.deleted_at, 0, 0))
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсор старше срока хранения отметок об '
+            'удалении не принимается.'
+        )
+
+    def test_05_idle_client_cursor_advances(self, client, admin_client,
+                                            settings):
+        settings.CHANGES_TOMBSTONE_RETENTION_DAYS = 30
+        changes, cursor = self.sync(client, encode_change_cursor(
+            (timezone.now() - timedelta(days=29), 0, 0)
+        ))
+        assert changes == []
+        changed_at, _, _ = decode_change_cursor(cursor)
+        assert changed_at > timezone.now() - timedelta(minutes=1), (
+            'Проверьте, что пустая порция продвигает курсор до границы '
+            'отдаваемых изменений, и курсор клиента без пропущенных '
+            'изменений не устаревает.'
+        )
+        titles, _, _ = create_titles(admin_client)
+        changes, _ = self.sync(client, cursor)
+        assert sorted(self.summary(changes)) == [
+            ('title', 'upsert', title['id']) for title in titles
+        ], (
+            'Проверьте, что продвинутый курсор не пропускает новые '
+            'изменения.'
+        )
@@ -0,0 +1,114 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from api_yamdb.asgi import application
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+class EventStream:
+    """Клиент ASGI, читающий поток событий без HTTP-сервера."""
+
+    def __init__(self, path, method='GET'):
+        self.scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [],
+        }
+        self.incoming = asyncio.Queue()
+        self.messages = asyncio.Queue()
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        await self.messages.put(message)
+
+    def start(self):
+        self.task = asyncio.ensure_future(
+            application(self.scope, self.receive, self.send)
+        )
+
+    async def next_message(self):
+        return await asyncio.wait_for(self.messages.get(), timeout=5)
+
+    async def close(self):
+        await self.incoming.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(self.task, timeout=5)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleEventsAPI:
+
+    def test_01_review_and_comment_events(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+
+        async def scenario():
+            stream = EventStream(f'/api/v1/titles/{title_id}/events/')
+            stream.start()
+            start = await stream.next_message()
+            assert start['status'] == HTTPStatus.OK
+            assert (
+                b'content-type', b'text/event-stream; charset=utf-8'
+            ) in start['headers']
+            assert (await stream.next_message())['body'].startswith(
+                b'retry:'
+            )
+            review = (await sync_to_async(create_single_review)(
+                user_client, title_id, 'Отзыв', 8
+            )).json()
+            frame = (await stream.next_message())['body']
+            await sync_to_async(create_single_comment)(
+                user_client, title_id, review['id'], 'Комментарий'
+            )
+            comment_frame = (await stream.next_message())['body']
+            await stream.close()
+            return review, frame, comment_frame
+
+        review, frame, comment_frame = asyncio.run(scenario())
+        assert frame.startswith(
+            b'event: review\nid: review-%d\ndata: ' % review['id']
+        ), (
+            'Проверьте, что новый отзыв публикуется в поток событий '
+            'произведения.'
+        )
+        assert 'Отзыв'.encode() in frame
+        assert comment_frame.startswith(b'event: comment\n'), (
+            'Проверьте, что новый комментарий публикуется в поток событий '
+            'произведения.'
+        )
+
+    def test_02_other_title_and_missing_title(self, admin_client,
+                                              user_client):
+        titles, _, _ = create_titles(admin_client)
+
+        async def scenario():
+            missing = EventStream('/api/v1/titles/999999/events/')
+            missing.start()
+            missing_status = (await missing.next_message())['status']
+            await missing.task
+
+            stream = EventStream(f'/api/v1/titles/{titles[0]["id"]}/events/')
+            stream.start()
+            await stream.next_message()
+            await stream.next_message()
+            await sync_to_async(create_single_review)(
+                user_client, titles[1]['id'], 'Отзыв', 8
+            )
+            await asyncio.sleep(0.1)
+            leaked = not stream.messages.empty()
+            await stream.close()
+            return missing_status, leaked
+
+        missing_status, leaked = asyncio.run(scenario())
+        assert missing_status == HTTPStatus.NOT_FOUND
+        assert not leaked, (
+            'Проверьте, что в поток произведения не попадают события '
+            'других произведений.'
+        )
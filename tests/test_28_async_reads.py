@@ -0,0 +1,70 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.test.client import AsyncClientHandler
+from django.urls import resolve
+
+from api.async_views import AsyncReadHandlerMixin
+from tests.utils import create_comments
+
+
+class AsyncReadClientHandler(AsyncReadHandlerMixin, AsyncClientHandler):
+    """Обработчик тестового клиента, выбирающий вью как под ASGI."""
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28AsyncReadsAPI:
+
+    ASYNC_URLS = (
+        '/api/v1/genres/',
+        '/api/v1/categories/',
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    )
+
+    def test_01_views_are_async_only_under_asgi(self):
+        for url in self.ASYNC_URLS:
+            url = url.format(title_id=1, review_id=1)
+            view = resolve(url).func
+            assert not asyncio.iscoroutinefunction(view), (
+                f'Проверьте, что под WSGI `{url}` вызывается напрямую, без '
+                'async_to_sync.'
+            )
+            assert asyncio.iscoroutinefunction(view.async_view), (
+                f'Проверьте, что под ASGI `{url}` обслуживается '
+                'асинхронным вью.'
+            )
+        assert not hasattr(resolve('/api/v1/users/').func, 'async_view')
+
+    @pytest.mark.parametrize('async_reads', (True, False))
+    def test_02_async_client_matches_sync(self, settings, admin_client,
+                                          client, user_client, user,
+                                          async_reads):
+        settings.ASYNC_READ_VIEWS = async_reads
+        _, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        async_client = AsyncClient()
+        async_client.handler = AsyncReadClientHandler()
+
+        async def fetch(url):
+            return await async_client.get(url)
+
+        for url in self.ASYNC_URLS:
+            url = url.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+            response = async_to_sync(fetch)(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` под ASGI возвращает '
+                'ответ со статусом 200.'
+            )
+            assert response.json() == client.get(url).json(), (
+                f'Проверьте, что ответ `{url}` под ASGI совпадает с '
+                'ответом под WSGI.'
+            )
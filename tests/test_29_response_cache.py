@@ -0,0 +1,147 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.singleflight import SingleFlight, get_or_compute, lock_key
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+def test_single_flight_runs_once():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    def worker():
+        results.append(flight.do('key', compute))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=worker) for _ in range(5)]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+    assert len(calls) == 1, (
+        'Проверьте, что одновременные промахи по одному ключу ждут одного '
+        'вычисления.'
+    )
+    assert results == ['result'] * 6
+
+
+def test_stale_value_served_while_revalidating():
+    key = 'test-singleflight-stale'
+    cache.set(key, ('old', time.time() - 1), 60)
+    assert get_or_compute(key, lambda: 'new') == 'old', (
+        'Проверьте, что устаревшее значение отдаётся без ожидания пересчёта.'
+    )
+    deadline = time.monotonic() + 5
+    while cache.get(key)[0] != 'new' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get(key)[0] == 'new'
+    assert cache.get(lock_key(key)) is None
+
+
+def test_waits_for_other_worker(settings):
+    settings.SINGLEFLIGHT_POLL_SECONDS = 0.01
+    key = 'test-singleflight-worker'
+    cache.delete(key)
+    cache.add(lock_key(key), True, 30)
+
+    def other_worker():
+        time.sleep(0.1)
+        cache.set(key, ('computed elsewhere', time.time() + 30), 60)
+        cache.delete(lock_key(key))
+
+    thread = threading.Thread(target=other_worker)
+    thread.start()
+
+    def compute():
+        raise AssertionError('Значение вычисляет другой процесс.')
+
+    try:
+        assert get_or_compute(key, compute) == 'computed elsewhere', (
+            'Проверьте, что при блокировке в кэше промах ждёт значения '
+            'от другого процесса.'
+        )
+    finally:
+        thread.join(5)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ResponseCacheAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_title_detail_cached_and_invalidated(self, admin_client,
+                                                    client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 0, (
+            'Проверьте, что повторный запрос карточки произведения '
+            'отдаётся из кэша.'
+        )
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 6)
+        assert client.get(url).json()['rating'] == 6, (
+            'Проверьте, что новый отзыв сбрасывает кэш карточки.'
+        )
+
+    def test_02_title_list_invalidated(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        assert client.get(self.TITLES_URL).json()['count'] == 2
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Новое',
+            'year': 2000,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert client.get(self.TITLES_URL).json()['count'] == 3, (
+            'Проверьте, что новое произведение сбрасывает кэш списка.'
+        )
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        detail = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/').json()
+        assert detail['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш карточек.'
+        )
+
+    def test_03_stale_detail_refreshed_in_background(self, admin_client,
+                                                     client, settings):
+        settings.RESPONSE_CACHE_TTL = 0.05
+        settings.RESPONSE_CACHE_STALE_FACTOR = 1000
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        client.get(url)
+        # Изменение без сигналов: версия кэша не меняется.
+        Title.objects.filter(pk=titles[0]['id']).update(name='Обновлено')
+        time.sleep(0.1)
+        assert client.get(url).json()['name'] == titles[0]['name'], (
+            'Проверьте, что устаревший ответ отдаётся без ожидания.'
+        )
+        deadline = time.monotonic() + 5
+        name = None
+        while name != 'Обновлено' and time.monotonic() < deadline:
+            time.sleep(0.02)
+            name = client.get(url).json()['name']
+        assert name == 'Обновлено', (
+            'Проверьте, что устаревший ответ пересчитывается в фоне.'
+        )
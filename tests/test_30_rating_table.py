@@ -0,0 +1,144 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_migrate
+
+from reviews import cache_versions
+from reviews.models import Title
+from reviews.rating_table import (SEQUENCE, RatingTable, get_table,
+                                  write_titles)
+from tests.utils import create_single_review, create_titles
+
+
+def test_put_get_and_grow(tmp_path):
+    path = tmp_path / 'ratings'
+    table = RatingTable(path, 4)
+    assert table.get(2) is None
+    table.put(10, 15, 2)
+    assert table.capacity > 10, (
+        'Проверьте, что таблица растёт, если id не помещается.'
+    )
+    other = RatingTable(path, 4)
+    assert other.get(10) == (15, 2, 7.5), (
+        'Проверьте, что запись видна через другое отображение файла.'
+    )
+    table.put(10, 0, 0)
+    assert other.get(10) == (0, 0, None)
+
+
+def test_torn_write_not_returned(tmp_path):
+    table = RatingTable(tmp_path / 'ratings', 4)
+    table.put(1, 8, 1)
+    SEQUENCE.pack_into(table.map, table.offset(1), 3)
+    assert table.get(1) is None, (
+        'Проверьте, что запись в процессе изменения не читается.'
+    )
+
+
+def test_clear(tmp_path):
+    path = tmp_path / 'ratings'
+    table = RatingTable(path, 4)
+    table.put(1, 8, 1)
+    other = RatingTable(path, 4)
+    other.clear()
+    assert table.get(1) is None, (
+        'Проверьте, что стёртая запись не читается и рейтинг берётся из БД.'
+    )
+    table.put(1, 6, 1)
+    assert other.get(1) == (6, 1, 6.0)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30RatingTableAPI:
+
+    def test_01_review_updates_table(self, settings, tmp_path, admin_client,
+                                     client, user_client):
+        settings.RATING_TABLE_PATH = str(tmp_path / 'ratings')
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 6)
+        table = get_table()
+        assert table.get(title_id) == (6, 1, 6.0), (
+            'Проверьте, что новый отзыв записывается в общую таблицу '
+            'рейтингов.'
+        )
+        table.put(title_id, 9, 1)
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что рейтинг произведения читается из общей таблицы.'
+        )
+        call_command('rebuild_rating_table')
+        assert table.get(title_id) == (6, 1, 6.0)
+        assert table.get(titles[1]['id']) == (0, 0, None)
+
+    def test_02_migrate_clears_table(self, settings, tmp_path, admin_client,
+                                     user_client):
+        settings.RATING_TABLE_PATH = str(tmp_path / 'ratings')
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 6)
+        app_config = apps.get_app_config('reviews')
+        post_migrate.send(
+            sender=app_config, app_config=app_config,
+            verbosity=0, interactive=False, using='default',
+            apps=apps, plan=[],
+        )
+        assert get_table().get(title_id) is None, (
+            'Проверьте, что после migrate общая таблица рейтингов стирается.'
+        )
+
+    def test_03_refresh_reads_under_lock(self, settings, tmp_path,
+                                         admin_client, user_client):
+        settings.RATING_TABLE_PATH = str(tmp_path / 'ratings')
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 6)
+        table = get_table()
+
+        def refresh():
+            try:
+                write_titles(table, Title.objects.filter(pk=title_id))
+            finally:
+                connection.close()
+
+        with table.locked():
+            writer = threading.Thread(target=refresh)
+            writer.start()
+            time.sleep(0.05)
+            # Более новый перенос, зафиксированный, пока первый ждал.
+            Title.objects.filter(pk=title_id).update(score_sum=9)
+        writer.join(5)
+        assert table.get(title_id) == (9, 1, 9.0), (
+            'Проверьте, что счётчики читаются из БД под блокировкой '
+            'таблицы и старое значение не перезаписывает новое.'
+        )
+
+    def test_04_table_updated_before_cache_versions(self, settings,
+                                                    tmp_path, admin_client,
+                                                    client, user_client):
+        settings.RATING_TABLE_PATH = str(tmp_path / 'ratings')
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        detail_url = f'/api/v1/titles/{title_id}/'
+        assert client.get(detail_url).json()['rating'] is None
+        table = get_table()
+        bump = cache_versions.bump
+        seen = []
+
+        def record_table(*names):
+            if cache_versions.title_detail(title_id) in names:
+                seen.append(table.get(title_id))
+            bump(*names)
+
+        with mock.patch.object(cache_versions, 'bump', record_table):
+            create_single_review(user_client, title_id, 'Отзыв', 6)
+        assert seen == [(6, 1, 6.0)], (
+            'Проверьте, что общая таблица рейтингов обновляется до смены '
+            'версий кэша ответов.'
+        )
+        assert client.get(detail_url).json()['rating'] == 6